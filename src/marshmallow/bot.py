@@ -2,9 +2,11 @@
 
 import logging
 
-from discord.ext import commands
+from discord.ext import commands, tasks
 
 import marshmallow.settings as stg
+import marshmallow.utility.datawriter as dw
+import marshmallow.utility.offload as ou
 
 
 class MarshmallowBot(commands.Bot):
@@ -29,6 +31,23 @@ class MarshmallowBot(commands.Bot):
     async def setup_hook(self) -> None:
         """A coroutine to be called to setup the bot."""
         await self._load_extensions()
+        self.flusher.start()
+
+    @tasks.loop(seconds=30.0)
+    async def flusher(self) -> None:
+        """Flushes the reports written behind to the store."""
+        await ou.run_io(dw.get_report_buffer().flush)
+
+    async def close(self) -> None:
+        """Closes the bot, then flushes reports and waits for pending file I/O.
+
+        Closing unloads every extension and awaits each cog's cog_unload, so
+        cogs flush their own state before the I/O thread pool shuts down.
+        """
+        self.flusher.cancel()
+        await super().close()
+        await ou.run_io(dw.get_report_buffer().flush)
+        ou.shutdown()
 
     async def on_ready(self) -> None:
         """Event called upon successful login and loaded data."""
@@ -0,0 +1,202 @@
+"""This module represents the portion of the bot relevant to live activity.
+
+Containing a cog, the activity module counts every guild message as it
+arrives into hourly histograms per channel and author, and periodically
+flushes the changed series to the store, so activity reports for any
+window since counting began are answered without replaying history.
+"""
+
+import datetime as dt
+import logging
+from enum import StrEnum, auto
+
+import discord
+from discord.ext import commands, tasks
+
+import marshmallow.settings as stg
+import marshmallow.utility.dutils as du
+import marshmallow.utility.offload as ou
+import marshmallow.utility.store as st
+from marshmallow.utility.histogram import ActivityHistogram
+
+
+class Period(StrEnum):
+    """The rollup periods."""
+
+    DAY = auto()
+    WEEK = auto()
+
+    def get_length(self) -> dt.timedelta:
+        """Returns the length of the period."""
+        return dt.timedelta(days=7 if self is Period.WEEK else 1)
+
+
+class Activity(commands.Cog):
+    """Cog for live activity counting."""
+
+    def __init__(self, bot: commands.Bot) -> None:
+        """Instantiates the cog."""
+        self.bot: commands.Bot = bot
+        "The cog's associated bot client."
+        self.logger = logging.getLogger(__name__)
+        "The cog's associated logger."
+        self.store: st.Store = st.get_store()
+        "The store the counts are flushed to."
+        self.histogram: ActivityHistogram = ActivityHistogram()
+        "The hourly message counts of each channel and author."
+        self.since: dt.datetime = discord.utils.utcnow()
+        "When live counting began."
+
+    async def cog_load(self) -> None:
+        """Loads the saved histograms and starts flushing."""
+        self.since = await ou.run_io(
+            self.store.get_activity_since,
+            discord.utils.utcnow(),
+        )
+        self.histogram.load(await ou.run_io(self.store.get_histograms))
+        self.flusher.start()
+
+    async def cog_unload(self) -> None:
+        """Stops flushing and flushes the remaining counts."""
+        self.flusher.cancel()
+        await self.flush()
+
+    @tasks.loop(minutes=1.0)
+    async def flusher(self) -> None:
+        """Periodically flushes the counts."""
+        await self.flush()
+
+    async def flush(self) -> None:
+        """Saves the series changed since the last flush to the store."""
+        rows = self.histogram.pop_dirty()
+        if not rows:
+            return
+
+        await ou.run_io(self.store.save_histograms, rows)
+        self.logger.info("Flushed %d activity series.", len(rows))
+
+    @commands.Cog.listener()
+    async def on_message(self, message: discord.Message) -> None:
+        """Counts the message towards its channel, author and hour.
+
+        Args:
+            message (discord.Message): The message.
+        """
+        if not message.guild:
+            return
+
+        author = (message.author.display_name, message.author.name)
+        self.histogram.add(message.channel.id, author, message.created_at)
+
+    def _get_window(
+        self,
+        start: dt.datetime | None,
+        end: dt.datetime | None,
+    ) -> tuple[dt.datetime, dt.datetime]:
+        return start or self.since, end or discord.utils.utcnow()
+
+    @commands.hybrid_command()
+    @commands.guild_only()
+    @commands.has_any_role(*stg.get_admin_roles())
+    async def get_live_message_count(
+        self,
+        ctx: commands.Context,
+        channel: discord.TextChannel | discord.CategoryChannel,
+        start: du.DateTimeConverter | None = None,
+        end: du.DateTimeConverter | None = None,
+    ) -> None:
+        """Sends message counts of a channel or category from start to end date.
+
+        Args:
+            ctx (commands.Context): The command context.
+            channel (discord.TextChannel | discord.CategoryChannel): The channel
+                or category to report activity for.
+            start (str): Activity start date, e.g. "02/15/23 12:53PM", or when
+                counting began.
+            end (str): Activity end date, e.g. "02/15/23 12:57PM", or now.
+        """
+        self.logger.info(
+            "%s called command 'get_live_message_count' on %s in %s.",
+            ctx.author.display_name,
+            channel.name,
+            ctx.guild.name,
+        )
+
+        start, end = self._get_window(start, end)
+        if start > end:
+            await ctx.send("The start date must be before the end date.")
+            return
+
+        counts = self.histogram.get_counts(get_channel_ids(channel), start, end)
+        rows = [
+            {"name": name, "username": username, "count": count}
+            for (name, username), count in counts.most_common(10)
+        ]
+        report = f"{channel.name} {du.get_window_label(start, end)}"
+        await ctx.send(embed=du.get_message_counts_embed(rows, report))
+
+    @commands.hybrid_command()
+    @commands.guild_only()
+    @commands.has_any_role(*stg.get_admin_roles())
+    async def get_activity_rollup(
+        self,
+        ctx: commands.Context,
+        channel: discord.TextChannel | discord.CategoryChannel,
+        period: Period,
+        start: du.DateTimeConverter | None = None,
+        end: du.DateTimeConverter | None = None,
+    ) -> None:
+        """Sends message totals of a channel or category per day or week.
+
+        Args:
+            ctx (commands.Context): The command context.
+            channel (discord.TextChannel | discord.CategoryChannel): The channel
+                or category to report activity for.
+            period (Period): The length of each total.
+            start (str): Activity start date, e.g. "02/15/23 12:53PM", or when
+                counting began.
+            end (str): Activity end date, e.g. "02/15/23 12:57PM", or now.
+        """
+        self.logger.info(
+            "%s called command 'get_activity_rollup' on %s by %s in %s.",
+            ctx.author.display_name,
+            channel.name,
+            period,
+            ctx.guild.name,
+        )
+
+        start, end = self._get_window(start, end)
+        if start > end:
+            await ctx.send("The start date must be before the end date.")
+            return
+
+        rollup = self.histogram.get_rollup(
+            get_channel_ids(channel),
+            start,
+            end,
+            period.get_length(),
+        )
+        report = f"{channel.name} {du.get_window_label(start, end)}"
+        await ctx.send(embed=du.get_activity_rollup_embed(rollup, report))
+
+
+def get_channel_ids(
+    channel: discord.TextChannel | discord.CategoryChannel,
+) -> list[int]:
+    """Returns the ids of the text channels in a channel or category.
+
+    Args:
+        channel (discord.TextChannel | discord.CategoryChannel): The channel
+            or category.
+
+    Returns:
+        list[int]: The ids of the text channels.
+    """
+    if isinstance(channel, discord.CategoryChannel):
+        return [ch.id for ch in channel.text_channels]
+    return [channel.id]
+
+
+async def setup(bot: commands.Bot) -> None:
+    """Adds the cog to the bot."""
+    await bot.add_cog(Activity(bot))
@@ -10,8 +10,12 @@ from discord.ext import commands
 import marshmallow.settings as stg
 import marshmallow.utility.dmaps as dm
 import marshmallow.utility.processor as pr
+from marshmallow.models import Cohort
 from marshmallow.utility.dataproducer import DataServer
 from marshmallow.utility.datawriter import DataWriter
+from marshmallow.utility.executor import MutationExecutor
+from marshmallow.utility.overwrites import OverwriteBatch
+from marshmallow.utility.progress import ProgressReporter
 
 
 class Affinity(commands.Cog):
@@ -27,6 +31,8 @@ class Affinity(commands.Cog):
         "A server for data for the cog."
         self.writer: DataWriter = DataWriter()
         "A writer for data from the cog."
+        self.executor: MutationExecutor = MutationExecutor()
+        "An executor for the cog's bulk mutations."
 
     @commands.hybrid_command()
     @commands.guild_only()
@@ -76,11 +82,21 @@ class Affinity(commands.Cog):
             # "fli-foster-lead",
         ]
 
-        people = self.server.get_people(group)
-        member_alias_map = pr.get_member_guild_name_map(ctx.guild.members)
+        people = await self.server.aget_people(group)
+        indexing = self.bot.get_cog("Indexing")
+        name_index = indexing.get_member_name_index(ctx.guild)
+        member_alias_map = name_index.members_to_guild_names
+        match_cache = indexing.get_match_cache(ctx.guild)
         channel_map = await dm.get_channel_map(ctx, channel_names)
         management = self.bot.get_cog("Management")
+        pr.set_guild_members(
+            [p for p in people if p.info.affinity_groups],
+            member_alias_map,
+            cache=match_cache,
+        )
+        match_cache.save()
 
+        batch = OverwriteBatch()
         for p in people:
             if not p.info.affinity_groups:
                 self.logger.info(
@@ -90,7 +106,6 @@ class Affinity(commands.Cog):
                 )
                 continue
 
-            p.set_guild_member(member_alias_map)
             if not p.guild_member:
                 continue
 
@@ -101,10 +116,17 @@ class Affinity(commands.Cog):
             channels = [channel_map[g] for g in affinity_groups if g in channel_map]
 
             for ch in channels:
-                await management.grant_channel_access(ctx, p.guild_member, ch)
+                management.add_channel_access(batch, p.guild_member, ch)
+
+        async with ProgressReporter(
+            ctx,
+            self.logger,
+            "Affinity Assignments",
+        ) as progress:
+            report = await self.executor.run(batch.get_mutations(), progress)
+            await progress.finish(f"{report.get_summary()} {batch.get_summary()}")
 
-        self.writer.write_assignment_report(people, group)
-        await ctx.send("Affinity Assignments Completed.")
+        await self.writer.awrite_assignment_report(Cohort(people), group)
 
 
 async def setup(bot: commands.Bot) -> None:
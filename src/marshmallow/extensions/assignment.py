@@ -2,16 +2,24 @@
 
 import asyncio
 import logging
+import time
 from enum import StrEnum, auto
 
+import discord
 from discord.ext import commands, tasks
 
 import marshmallow.settings as stg
 import marshmallow.utility.dutils as du
+import marshmallow.utility.executor as ex
+import marshmallow.utility.offload as ou
+import marshmallow.utility.pipeline as pl
 import marshmallow.utility.processor as pr
+from marshmallow.models import Cohort, GuildPerson
 from marshmallow.utility.dataproducer import DataServer
 from marshmallow.utility.datawriter import DataWriter
 from marshmallow.utility.dutils import log_send
+from marshmallow.utility.executor import ExecutionReport, MutationExecutor
+from marshmallow.utility.progress import ProgressReporter
 
 
 class Group(StrEnum):
@@ -22,6 +30,13 @@ class Group(StrEnum):
     SIFP = auto()
 
 
+class MatchMode(StrEnum):
+    """The name-matching modes."""
+
+    EXACT = auto()
+    FUZZY = auto()
+
+
 class Assignment(commands.Cog):
     """A cog for assignment commands."""
 
@@ -33,12 +48,14 @@ class Assignment(commands.Cog):
         "The cog's associated logger."
         self.lock = asyncio.Lock()
         "The cog's lock."
-        self.assign_cache: dict[str, commands.Context] = {}
+        self.assign_cache: dict[str, tuple[commands.Context, MatchMode]] = {}
         "The cog's cache for automatic role assignments."
         self.server: DataServer = DataServer()
         "A server for data needed in the cog."
         self.writer: DataWriter = DataWriter()
         "A writer for data from the cog."
+        self.executor: MutationExecutor = MutationExecutor()
+        "An executor for the cog's bulk mutations."
 
     @tasks.loop(minutes=15.0)
     async def assigner(self) -> None:
@@ -48,13 +65,18 @@ class Assignment(commands.Cog):
             ctx (commands.Context): The context object for automatic role assignment.
             assignment_group (str): The desired assignment group.
         """
-        for group, ctx in self.assign_cache.items():
+        for group, (ctx, mode) in self.assign_cache.items():
             async with self.lock:
-                await self.assign(ctx, group)
+                await self.assign(ctx, group, mode)
 
-    def cache_assignment(self, ctx: commands.Context, assignment_group: str) -> None:
+    def cache_assignment(
+        self,
+        ctx: commands.Context,
+        assignment_group: str,
+        mode: MatchMode,
+    ) -> None:
         """Caches the assignment task."""
-        self.assign_cache[assignment_group] = ctx
+        self.assign_cache[assignment_group] = (ctx, mode)
 
     @commands.hybrid_command()
     @commands.guild_only()
@@ -82,6 +104,7 @@ class Assignment(commands.Cog):
         self,
         ctx: commands.Context,
         group: Group,
+        mode: MatchMode = MatchMode.EXACT,
     ) -> None:
         """Automatically assigns roles for assignment group.
 
@@ -91,6 +114,8 @@ class Assignment(commands.Cog):
         Args:
             ctx (commands.Context): The command context.
             group (str): The assignment group.
+            mode (MatchMode): The name-matching mode, where fuzzy mode also
+                matches people with typos, diacritics or reordered names.
         """
         self.logger.info(
             "%s called command 'assign' for %s in %s.",
@@ -99,23 +124,68 @@ class Assignment(commands.Cog):
             ctx.guild.name,
         )
 
-        self.cache_assignment(ctx, group)
-        people = self.server.get_people(group)
-        member_alias_map = pr.get_member_guild_name_map(ctx.guild.members)
-
-        for p in people:
-            p.set_guild_member(member_alias_map)
-            p.set_guild_roles()
+        self.cache_assignment(ctx, group, mode)
+        indexing = self.bot.get_cog("Indexing")
+        name_index = indexing.get_member_name_index(ctx.guild)
+        member_alias_map = name_index.members_to_guild_names
+        match_cache = indexing.get_match_cache(ctx.guild)
+        role_index = indexing.get_role_index(ctx.guild)
+
+        matcher = pr.StreamingMatcher(member_alias_map, match_cache)
+        people: list[GuildPerson] = []
+        reports: list[ExecutionReport] = []
+
+        async def settle(chunk: list[GuildPerson]) -> list[GuildPerson]:
+            people.extend(chunk)
+            return matcher.settle(chunk)
+
+        async def designate(chunk: list[GuildPerson]) -> list[GuildPerson]:
+            for p in chunk:
+                p.set_guild_roles(role_index.roles)
+            return chunk
+
+        async def assign_roles(chunk: list[GuildPerson]) -> list[GuildPerson]:
+            deltas = pr.get_role_deltas(chunk)
+            mutations = [ex.add_roles(member, *roles) for member, roles in deltas]
+            reports.append(await self.executor.run(mutations, progress))
+            return chunk
+
+        async with ProgressReporter(ctx, self.logger, "Role Assignments") as progress:
+            start = time.perf_counter()
+            # People with a settled match are assigned while later chunks are
+            # still being read; the rest are matched one-to-one once the whole
+            # cohort is known, off the event loop as the fuzzy stage is CPU-bound.
+            await pl.run_pipeline(
+                self.server.aiter_people(group),
+                settle,
+                designate,
+                assign_roles,
+            )
+            rest = [p for p in people if not p.guild_member]
+            await ou.run_io(
+                pr.set_guild_members,
+                rest,
+                matcher.get_unclaimed(),
+                fuzzy=mode == MatchMode.FUZZY,
+                cache=match_cache,
+            )
+            await assign_roles(await designate(rest))
+            report = ExecutionReport.combine(reports, time.perf_counter() - start)
+            await progress.finish(report.get_summary())
+
+        match_cache.save()
         self.logger.info("Mapped People to Guild Members and Designated Guild Roles.")
 
-        await log_send(ctx, self.logger, "*Starting Role Assignments.*")
-        for p in people:
-            await p.assign_roles(ctx)
-        await log_send(ctx, self.logger, "*Finished Role Assignments.*")
-
-        self.writer.write_assignment_report(people, group)
-        found, not_found = pr.get_assignment_counts(people)
-        embed = du.get_assignment_summary_embed(ctx, found, not_found)
+        cohort = Cohort(people)
+        await self.writer.awrite_assignment_report(cohort, group)
+        found, not_found = pr.get_assignment_counts(cohort)
+        embed = du.get_assignment_summary_embed(
+            ctx,
+            found,
+            not_found,
+            cohort.get_role_tallies(),
+            cohort.get_unmatched(cohort.full_names),
+        )
         await ctx.send(embed=embed)
 
     @commands.hybrid_command()
@@ -126,12 +196,14 @@ class Assignment(commands.Cog):
         self,
         ctx: commands.Context,
         assignment_group: str,
+        export: bool = False,  # noqa: FBT001, FBT002
     ) -> None:
         """Sends a report unidentified people.
 
         Args:
             ctx (commands.Context): The command context.
             assignment_group (str): The assignment group.
+            export (bool): Whether to attach the full report as a csv file.
         """
         if not ctx.guild:
             return
@@ -143,8 +215,14 @@ class Assignment(commands.Cog):
             ctx.guild.name,
         )
 
-        people = self.server.get_report_people(assignment_group)
-        await ctx.send(embed=du.get_failed_assignments_embed(people, assignment_group))
+        unmatched = await self.server.aget_unmatched_people(assignment_group)
+        embed = du.get_failed_assignments_embed(unmatched, assignment_group)
+        if not export:
+            await ctx.send(embed=embed)
+            return
+
+        path = await self.writer.aexport_assignment_report(assignment_group)
+        await ctx.send(embed=embed, file=discord.File(path))
 
 
 async def setup(bot: commands.Bot) -> None:
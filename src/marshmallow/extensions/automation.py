@@ -6,8 +6,12 @@ import discord
 from discord.ext import commands
 
 import marshmallow.settings as stg
+import marshmallow.utility.layout as ly
+import marshmallow.utility.offload as ou
 from marshmallow.utility.dataproducer import DataServer
 from marshmallow.utility.datawriter import DataWriter
+from marshmallow.utility.dutils import PREVIEW_LIMIT
+from marshmallow.utility.progress import ProgressReporter
 
 
 class Automation(commands.Cog):
@@ -51,21 +55,84 @@ class Automation(commands.Cog):
             start (int): The clone range start.
             end (int): The clone range end (exclusive).
         """
-        management: commands.Cog = self.bot.get_cog("Management")
+        self.logger.info(
+            "%s called command 'create_groups' from %d to %d in %s.",
+            ctx.author.display_name,
+            start,
+            end,
+            ctx.guild.name,
+        )
 
-        for i in range(start, end):
-            channel_name = f"{channel_base_name}{i}"
-            role_name = f"{role_base_name}{i}"
+        management = self.bot.get_cog("Management")
+        indexing = self.bot.get_cog("Indexing")
+        groups = [
+            (f"{channel_base_name}{i}", f"{role_base_name}{i}")
+            for i in range(start, end)
+        ]
 
-            ch = discord.utils.get(ctx.guild.channels, name=channel_name)
-            if not ch:
-                ch = await management.clone_channel(ctx, channel, channel_name)
+        async with ProgressReporter(
+            ctx,
+            self.logger,
+            f"Creating Groups {start} to {end}",
+        ) as progress:
+            report = await management.provisioner.provision_groups(
+                indexing.get_channel_index(ctx.guild),
+                indexing.get_role_index(ctx.guild),
+                channel,
+                role,
+                groups,
+                progress,
+            )
+            await progress.finish(report.get_summary())
 
-            r = discord.utils.get(ctx.guild.roles, name=role_name)
-            if not r:
-                r = await management.clone_role(ctx, role, role_name)
+    @commands.hybrid_command()
+    @commands.guild_only()
+    @commands.has_any_role(*stg.get_admin_roles())
+    @commands.has_permissions(manage_channels=True, manage_roles=True)
+    async def apply_layout(
+        self,
+        ctx: commands.Context,
+        dry_run: bool = False,  # noqa: FBT001, FBT002
+    ) -> None:
+        """Brings the guild's roles and channels to the layout in settings.
+
+        Args:
+            ctx (commands.Context): The command context.
+            dry_run (bool): Whether to only list the planned changes.
+        """
+        self.logger.info(
+            "%s called command 'apply_layout'%s in %s.",
+            ctx.author.display_name,
+            " as a dry run" if dry_run else "",
+            ctx.guild.name,
+        )
+
+        management = self.bot.get_cog("Management")
+        indexing = self.bot.get_cog("Indexing")
+        layout = ly.parse_layout(await ou.run_io(stg.get_layout))
+        plan = ly.get_plan(
+            layout,
+            ctx.guild,
+            indexing.get_role_index(ctx.guild).roles,
+        )
+
+        if dry_run:
+            lines = plan.get_lines()
+            preview = "\n".join(lines[:PREVIEW_LIMIT]) or "No changes."
+            if len(lines) > PREVIEW_LIMIT:
+                preview += f"\n...and {len(lines) - PREVIEW_LIMIT} more."
+            await ctx.send(
+                f"```diff\n{preview}\n```Estimated API calls: {plan.get_estimate()}",
+            )
+            return
 
-            await management.grant_channel_access(ctx, r, ch)
+        async with ProgressReporter(
+            ctx,
+            self.logger,
+            "Applying Layout",
+        ) as progress:
+            report = await ly.apply_plan(plan, management.executor, progress)
+            await progress.finish(report.get_summary())
 
 
 async def setup(bot: commands.Bot) -> None:
@@ -0,0 +1,279 @@
+"""This module represents the portion of the bot relevant to guild indexes.
+
+Containing a cog, the indexing module maintains long-lived, per-guild
+indexes that are built once when a guild becomes available and kept
+current from gateway events, so commands never rebuild them.
+"""
+
+import logging
+
+import discord
+from discord.ext import commands
+
+import marshmallow.utility.processor as pr
+from marshmallow.utility.dmaps import ChannelIndex, RoleIndex, VisibilityIndex
+from marshmallow.utility.matchcache import MatchCache
+
+
+class Indexing(commands.Cog):
+    """Cog for maintaining per-guild indexes."""
+
+    def __init__(self, bot: commands.Bot) -> None:
+        """Instantiates the cog."""
+        self.bot: commands.Bot = bot
+        "The cog's associated bot client."
+        self.logger = logging.getLogger(__name__)
+        "The cog's associated logger."
+        self.member_names: dict[int, pr.MemberNameIndex] = {}
+        "The member name index of each guild."
+        self.match_caches: dict[int, MatchCache] = {}
+        "The persistent person to member match cache of each guild."
+        self.role_indexes: dict[int, RoleIndex] = {}
+        "The role name index of each guild."
+        self.channel_indexes: dict[int, ChannelIndex] = {}
+        "The channel name index of each guild."
+        self.visibility_indexes: dict[int, VisibilityIndex] = {}
+        "The channel visibility index of each guild."
+
+    def get_member_name_index(self, guild: discord.Guild) -> pr.MemberNameIndex:
+        """Returns the member name index of the guild, building it if needed.
+
+        Args:
+            guild (discord.Guild): The guild.
+
+        Returns:
+            MemberNameIndex: The guild's member name index.
+        """
+        if guild.id not in self.member_names:
+            self.member_names[guild.id] = pr.MemberNameIndex(guild.members)
+            self.logger.info(
+                "Built member name index of %d members for %s.",
+                len(guild.members),
+                guild.name,
+            )
+        return self.member_names[guild.id]
+
+    def get_role_index(self, guild: discord.Guild) -> RoleIndex:
+        """Returns the role name index of the guild, building it if needed.
+
+        Args:
+            guild (discord.Guild): The guild.
+
+        Returns:
+            RoleIndex: The guild's role name index.
+        """
+        if guild.id not in self.role_indexes:
+            self.role_indexes[guild.id] = RoleIndex(guild.roles)
+        return self.role_indexes[guild.id]
+
+    def get_channel_index(self, guild: discord.Guild) -> ChannelIndex:
+        """Returns the channel name index of the guild, building it if needed.
+
+        Args:
+            guild (discord.Guild): The guild.
+
+        Returns:
+            ChannelIndex: The guild's channel name index.
+        """
+        if guild.id not in self.channel_indexes:
+            self.channel_indexes[guild.id] = ChannelIndex(guild.channels)
+        return self.channel_indexes[guild.id]
+
+    def get_visibility_index(self, guild: discord.Guild) -> VisibilityIndex:
+        """Returns the channel visibility index of the guild, creating it if needed.
+
+        Args:
+            guild (discord.Guild): The guild.
+
+        Returns:
+            VisibilityIndex: The guild's channel visibility index.
+        """
+        if guild.id not in self.visibility_indexes:
+            self.visibility_indexes[guild.id] = VisibilityIndex(guild)
+        return self.visibility_indexes[guild.id]
+
+    def get_match_cache(self, guild: discord.Guild) -> MatchCache:
+        """Returns the match cache of the guild, loading it if needed.
+
+        Args:
+            guild (discord.Guild): The guild.
+
+        Returns:
+            MatchCache: The guild's match cache.
+        """
+        if guild.id not in self.match_caches:
+            self.match_caches[guild.id] = MatchCache(guild.id)
+        return self.match_caches[guild.id]
+
+    @commands.Cog.listener()
+    async def on_guild_available(self, guild: discord.Guild) -> None:
+        """Builds the indexes of a guild that became available.
+
+        Args:
+            guild (discord.Guild): The available guild.
+        """
+        self.member_names.pop(guild.id, None)
+        self.role_indexes.pop(guild.id, None)
+        self.channel_indexes.pop(guild.id, None)
+        self.visibility_indexes.pop(guild.id, None)
+        self.get_member_name_index(guild)
+        self.get_role_index(guild)
+        self.get_channel_index(guild)
+
+    @commands.Cog.listener()
+    async def on_guild_remove(self, guild: discord.Guild) -> None:
+        """Drops the indexes of a guild the bot left.
+
+        Args:
+            guild (discord.Guild): The departed guild.
+        """
+        self.member_names.pop(guild.id, None)
+        self.role_indexes.pop(guild.id, None)
+        self.channel_indexes.pop(guild.id, None)
+        self.visibility_indexes.pop(guild.id, None)
+        self.logger.info("Dropped indexes of %s.", guild.name)
+
+    @commands.Cog.listener()
+    async def on_member_join(self, member: discord.Member) -> None:
+        """Indexes a member joining a guild.
+
+        Args:
+            member (discord.Member): The guild joinee.
+        """
+        if member.guild.id in self.member_names:
+            self.member_names[member.guild.id].update(member)
+        if member.guild.id in self.visibility_indexes:
+            self.visibility_indexes[member.guild.id].update_member(member)
+
+    @commands.Cog.listener()
+    async def on_member_remove(self, member: discord.Member) -> None:
+        """Unindexes a member leaving a guild.
+
+        Args:
+            member (discord.Member): The departed guild member.
+        """
+        if member.guild.id in self.member_names:
+            self.member_names[member.guild.id].remove(member)
+        if member.guild.id in self.visibility_indexes:
+            self.visibility_indexes[member.guild.id].remove_member(member)
+
+    @commands.Cog.listener()
+    async def on_member_update(
+        self,
+        before: discord.Member,
+        after: discord.Member,
+    ) -> None:
+        """Refreshes the guild names and channel visibility of an updated member.
+
+        Args:
+            before (discord.Member): The member prior to the update.
+            after (discord.Member): The member after the update.
+        """
+        if after.guild.id in self.member_names:
+            self.member_names[after.guild.id].update(after)
+        if before.roles != after.roles and after.guild.id in self.visibility_indexes:
+            self.visibility_indexes[after.guild.id].update_member(after)
+
+    @commands.Cog.listener()
+    async def on_user_update(
+        self,
+        before: discord.User,  # noqa: ARG002
+        after: discord.User,
+    ) -> None:
+        """Refreshes the guild names of an updated user in every guild.
+
+        Args:
+            before (discord.User): The user prior to the update.
+            after (discord.User): The user after the update.
+        """
+        for guild_id, index in self.member_names.items():
+            guild = self.bot.get_guild(guild_id)
+            member = guild.get_member(after.id) if guild else None
+            if member:
+                index.update(member)
+
+    @commands.Cog.listener()
+    async def on_guild_role_create(self, role: discord.Role) -> None:
+        """Invalidates the role name index of the role's guild.
+
+        Args:
+            role (discord.Role): The created role.
+        """
+        self.role_indexes.pop(role.guild.id, None)
+
+    @commands.Cog.listener()
+    async def on_guild_role_update(
+        self,
+        before: discord.Role,
+        after: discord.Role,
+    ) -> None:
+        """Invalidates the role name and channel visibility indexes of the guild.
+
+        Args:
+            before (discord.Role): The role prior to the update.
+            after (discord.Role): The role after the update.
+        """
+        self.role_indexes.pop(after.guild.id, None)
+        if before.permissions != after.permissions:
+            self.visibility_indexes.pop(after.guild.id, None)
+
+    @commands.Cog.listener()
+    async def on_guild_role_delete(self, role: discord.Role) -> None:
+        """Invalidates the role name and channel visibility indexes of the guild.
+
+        Args:
+            role (discord.Role): The deleted role.
+        """
+        self.role_indexes.pop(role.guild.id, None)
+        self.visibility_indexes.pop(role.guild.id, None)
+
+    @commands.Cog.listener()
+    async def on_guild_channel_create(
+        self,
+        channel: discord.abc.GuildChannel,
+    ) -> None:
+        """Invalidates the channel name index of the channel's guild.
+
+        Args:
+            channel (discord.abc.GuildChannel): The created channel.
+        """
+        self.channel_indexes.pop(channel.guild.id, None)
+
+    @commands.Cog.listener()
+    async def on_guild_channel_update(
+        self,
+        before: discord.abc.GuildChannel,
+        after: discord.abc.GuildChannel,
+    ) -> None:
+        """Invalidates the indexes affected by a renamed or reshared channel.
+
+        Args:
+            before (discord.abc.GuildChannel): The channel prior to the update.
+            after (discord.abc.GuildChannel): The channel after the update.
+        """
+        if before.name != after.name:
+            self.channel_indexes.pop(after.guild.id, None)
+        if (
+            before.overwrites != after.overwrites
+            and after.guild.id in self.visibility_indexes
+        ):
+            self.visibility_indexes[after.guild.id].invalidate(after)
+
+    @commands.Cog.listener()
+    async def on_guild_channel_delete(
+        self,
+        channel: discord.abc.GuildChannel,
+    ) -> None:
+        """Invalidates the channel name index of the channel's guild.
+
+        Args:
+            channel (discord.abc.GuildChannel): The deleted channel.
+        """
+        self.channel_indexes.pop(channel.guild.id, None)
+        if channel.guild.id in self.visibility_indexes:
+            self.visibility_indexes[channel.guild.id].invalidate(channel)
+
+
+async def setup(bot: commands.Bot) -> None:
+    """Adds the cog to the bot."""
+    await bot.add_cog(Indexing(bot))
@@ -4,6 +4,7 @@ Containing a cog, the information module stores several slash
 commands used to get information about guild members.
 """
 
+import datetime as dt
 import logging
 
 import discord
@@ -12,7 +13,10 @@ from discord.ext import commands
 
 import marshmallow.settings as stg
 import marshmallow.utility.dutils as du
+from marshmallow.utility.dataproducer import DataServer
 from marshmallow.utility.datawriter import DataWriter
+from marshmallow.utility.history import HistoryScanner
+from marshmallow.utility.progress import ProgressReporter
 
 
 class Information(commands.Cog):
@@ -24,8 +28,12 @@ class Information(commands.Cog):
         "The cog's associated bot client."
         self.logger = logging.getLogger(__name__)
         "The cog's associated logger."
+        self.server: DataServer = DataServer()
+        "A server for data needed in the cog."
         self.writer: DataWriter = DataWriter()
         "A writer for data from the cog."
+        self.scanner: HistoryScanner = HistoryScanner()
+        "A scanner of message history for the cog."
 
     @commands.hybrid_command()
     @commands.guild_only()
@@ -101,7 +109,6 @@ class Information(commands.Cog):
         await ctx.send(embed=info_embed)
         self.logger.info("Sent Member Information.")
 
-    # TODO: Add Embed Displaying Results
     @commands.hybrid_command()
     @commands.guild_only()
     @commands.has_any_role(*stg.get_admin_roles())
@@ -111,6 +118,7 @@ class Information(commands.Cog):
         channel: discord.TextChannel,
         start: du.DateTimeConverter,
         end: du.DateTimeConverter,
+        export: bool = False,  # noqa: FBT001, FBT002
     ) -> None:
         """Writes message count from start to end date.
 
@@ -119,6 +127,7 @@ class Information(commands.Cog):
             channel (discord.TextChannel): The channel to log activity for.
             start (str): Activity tracking start date, e.g. "02/15/23 12:53PM".
             end (str): Activity tracking end date "02/15/23 12:57PM".
+            export (bool): Whether to attach the full report as a csv file.
         """
         self.logger.info(
             "%s called command 'get_message_count' in %s.",
@@ -126,23 +135,87 @@ class Information(commands.Cog):
             ctx.guild.name,
         )
 
-        messages = channel.history(limit=None, after=start, before=end)
+        report = f"{channel.name[3:]}-{end.strftime('%m-%d-%y')}"
+        await self.send_message_report(
+            ctx,
+            [channel],
+            report,
+            start=start,
+            end=end,
+            export=export,
+        )
 
-        record = {}
-        await ctx.send(f"Checking Message History of {channel.name}.")
-        async for m in messages:
-            person = (m.author.display_name, m.author.name)
-            if person not in record:
-                record[person] = 0
-            record[person] += 1
-        await ctx.send(f"Finished Checking Message History {channel.name}.")
+    @commands.hybrid_command()
+    @commands.guild_only()
+    @commands.has_any_role(*stg.get_admin_roles())
+    async def get_category_message_count(
+        self,
+        ctx: commands.Context,
+        category: discord.CategoryChannel,
+        start: du.DateTimeConverter,
+        end: du.DateTimeConverter,
+        export: bool = False,  # noqa: FBT001, FBT002
+    ) -> None:
+        """Writes message count across a category from start to end date.
 
-        self.writer.write_message_counts(
-            record,
-            f"{channel.name[3:]}-{end.strftime('%m-%d-%y')}",
+        Args:
+            ctx (commands.Context): The command context.
+            category (discord.CategoryChannel): The category to log activity for.
+            start (str): Activity tracking start date, e.g. "02/15/23 12:53PM".
+            end (str): Activity tracking end date "02/15/23 12:57PM".
+            export (bool): Whether to attach the full report as a csv file.
+        """
+        self.logger.info(
+            "%s called command 'get_category_message_count' on %s in %s.",
+            ctx.author.display_name,
+            category.name,
+            ctx.guild.name,
         )
 
-        await ctx.send("Channel Activity Logged.")
+        report = f"{category.name}-{end.strftime('%m-%d-%y')}"
+        await self.send_message_report(
+            ctx,
+            category.text_channels,
+            report,
+            start=start,
+            end=end,
+            export=export,
+        )
+
+    async def send_message_report(
+        self,
+        ctx: commands.Context,
+        channels: list[discord.TextChannel],
+        report: str,
+        *,
+        start: dt.datetime,
+        end: dt.datetime,
+        export: bool,
+    ) -> None:
+        """Scans the channels, writes the message counts and sends the report.
+
+        Args:
+            ctx (commands.Context): The command context.
+            channels (list[discord.TextChannel]): The channels to log activity for.
+            report (str): The name of the message report.
+            start (dt.datetime): Activity tracking start date.
+            end (dt.datetime): Activity tracking end date.
+            export (bool): Whether to attach the full report as a csv file.
+        """
+        async with ProgressReporter(ctx, self.logger, "Message History") as progress:
+            scan = await self.scanner.scan(channels, start, end, progress)
+            await progress.finish(scan.get_summary())
+
+        await self.writer.awrite_message_counts(scan.counts, report)
+
+        rows = await self.server.aget_message_counts(report, limit=10)
+        embed = du.get_message_counts_embed(rows, report)
+        if not export:
+            await ctx.send(embed=embed)
+            return
+
+        path = await self.writer.aexport_message_counts(report)
+        await ctx.send(embed=embed, file=discord.File(path))
 
     @commands.hybrid_command()
     @commands.guild_only()
@@ -166,6 +239,32 @@ class Information(commands.Cog):
 
         await ctx.send(embed=du.get_people_embed(channel.members))
 
+    @commands.hybrid_command()
+    @commands.guild_only()
+    @commands.has_any_role(*stg.get_admin_roles())
+    async def get_channel_viewers(
+        self,
+        ctx: commands.Context,
+        channel: discord.TextChannel | discord.VoiceChannel | discord.CategoryChannel,
+    ) -> None:
+        """Displays the members who can view the specified channel.
+
+        Args:
+            ctx (commands.Context): The context object.
+            channel (discord.abc.GuildChannel): The text, voice or category
+                channel.
+        """
+        self.logger.info(
+            "%s called command 'get_channel_viewers' on %s in %s.",
+            ctx.author.display_name,
+            channel.name,
+            ctx.guild.name,
+        )
+
+        index = self.bot.get_cog("Indexing").get_visibility_index(ctx.guild)
+        members = index.get_members(channel)
+        await ctx.send(embed=du.get_channel_viewers_embed(members, channel))
+
 
 async def setup(bot: commands.Bot) -> None:
     """Adds the cog to the bot."""
@@ -27,9 +27,13 @@ class Introductions(commands.Cog):
         "The cog's associated logger."
         self.server: DataServer = DataServer()
         "The server of data for the cog."
-        self.welcomes: dict = self.server.get_welcome_messages()
+        self.welcomes: dict = {}
         "The program to welcome message mapping."
 
+    async def cog_load(self) -> None:
+        """Loads the welcome messages."""
+        self.welcomes = await self.server.aget_welcome_messages()
+
     @commands.Cog.listener()
     async def on_member_join(self, member: discord.Member) -> None:
         """Handles the member guild join event.
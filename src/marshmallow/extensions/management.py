@@ -5,13 +5,19 @@ and deletion of roles, channels.
 """
 
 import logging
+import time
 
 import discord
 from discord.ext import commands
 
 import marshmallow.settings as stg
 import marshmallow.utility.dchannels as dch
-from marshmallow.utility.dutils import log_send
+import marshmallow.utility.executor as ex
+from marshmallow.utility.dutils import PREVIEW_LIMIT, log_send
+from marshmallow.utility.executor import ExecutionReport, MutationExecutor
+from marshmallow.utility.overwrites import OverwriteBatch
+from marshmallow.utility.progress import ProgressReporter
+from marshmallow.utility.provisioning import Provisioner
 
 
 class Management(commands.Cog):
@@ -28,17 +34,27 @@ class Management(commands.Cog):
         "The cog's associated bot client."
         self.logger = logging.getLogger(__name__)
         "The cog's associated logger."
+        self.executor: MutationExecutor = MutationExecutor()
+        "An executor for the cog's bulk mutations."
+        self.provisioner: Provisioner = Provisioner(self.executor)
+        "A provisioner of the cog's bulk channels and roles."
 
     @commands.hybrid_command()
     @commands.guild_only()
     @commands.has_any_role(*stg.get_admin_roles())
     @commands.has_permissions(manage_channels=True)
-    async def delete_channels(self, ctx: commands.Context, substring: str) -> None:
+    async def delete_channels(
+        self,
+        ctx: commands.Context,
+        substring: str,
+        preview: bool = False,  # noqa: FBT001, FBT002
+    ) -> None:
         """Deletes all channels with 'substring' in their channel names.
 
         Args:
             ctx (commands.Context): The command context.
             substring (str): The substring for channel deletion.
+            preview (bool): Whether to only list the channels to delete.
         """
         self.logger.info(
             "%s called command 'delete_channels' with substring '%s' in %s.",
@@ -46,22 +62,13 @@ class Management(commands.Cog):
             substring,
             ctx.guild.name,
         )
-        channels = ctx.guild.channels
 
-        await log_send(
-            ctx,
-            self.logger,
-            f"*Deleting all channels with substring '{substring}.'*",
-        )
-        for ch in channels:
-            if substring in ch.name:
-                await ch.delete()
-                await log_send(ctx, self.logger, f"Deleted channel '{ch.name}.'")
-
-        await log_send(
+        channels = [ch for ch in ctx.guild.channels if substring in ch.name]
+        await self.delete(
             ctx,
-            self.logger,
-            f"*Deleted all channels with substring '{substring}.'*",
+            [channels],
+            f"{len(channels)} channels with substring '{substring}'",
+            preview=preview,
         )
 
     @commands.hybrid_command()
@@ -72,12 +79,14 @@ class Management(commands.Cog):
         self,
         ctx: commands.Context,
         category: discord.CategoryChannel,
+        preview: bool = False,  # noqa: FBT001, FBT002
     ) -> None:
         """Deletes the specified category and its channels.
 
         Args:
             ctx (commands.Context): The command context.
             category (discord.CategoryChannel): The category to delete.
+            preview (bool): Whether to only list the channels to delete.
         """
         self.logger.info(
             "%s called command 'delete_category' for '%s' in %s.",
@@ -85,31 +94,31 @@ class Management(commands.Cog):
             category.name,
             ctx.guild.name,
         )
-        channels = category.channels
 
-        await log_send(
+        channels = list(category.channels)
+        await self.delete(
             ctx,
-            self.logger,
-            f"Deleting Category, *{category.name}*, and subsequent channels.",
+            [channels, [category]],
+            f"category '{category.name}' and its {len(channels)} channels",
+            preview=preview,
         )
 
-        for ch in channels:
-            await ch.delete()
-            await log_send(ctx, self.logger, f"Deleted channel '{ch.name}'.")
-
-        await category.delete()
-        await log_send(ctx, self.logger, f"Deleted category '{category.name}'.")
-
     @commands.hybrid_command()
     @commands.guild_only()
     @commands.has_any_role(*stg.get_admin_roles())
     @commands.has_permissions(manage_roles=True)
-    async def delete_roles(self, ctx: commands.Context, substring: str) -> None:
+    async def delete_roles(
+        self,
+        ctx: commands.Context,
+        substring: str,
+        preview: bool = False,  # noqa: FBT001, FBT002
+    ) -> None:
         """Deletes all roles with 'substring' in their role names.
 
         Args:
             ctx (commands.Context): The command context.
             substring (str): The substring for role deletion.
+            preview (bool): Whether to only list the roles to delete.
         """
         self.logger.info(
             "%s called command 'delete_roles' with substring '%s' in %s.",
@@ -117,24 +126,59 @@ class Management(commands.Cog):
             substring,
             ctx.guild.name,
         )
-        roles = ctx.guild.roles
 
-        await log_send(
+        roles = [
+            r
+            for r in ctx.guild.roles
+            if substring in r.name and not (r.is_default() or r.managed)
+        ]
+        await self.delete(
             ctx,
-            self.logger,
-            f"Deleting all roles with base name: *{substring}*",
+            [roles],
+            f"{len(roles)} roles with substring '{substring}'",
+            preview=preview,
         )
 
-        for r in roles:
-            if substring in r.name:
-                await r.delete()
-                await log_send(ctx, self.logger, f"Deleted Role: *{r.name}*")
+    async def delete(
+        self,
+        ctx: commands.Context,
+        stages: list[list[discord.abc.GuildChannel | discord.Role]],
+        description: str,
+        *,
+        preview: bool,
+    ) -> None:
+        """Deletes a snapshot of channels or roles, or previews the deletion.
 
-        await log_send(
+        The objects of each stage are deleted concurrently, and each stage
+        starts once the previous one is done.
+
+        Args:
+            ctx (commands.Context): The command context.
+            stages (list[list]): The objects to delete, in stages.
+            description (str): A description of the objects.
+            preview (bool): Whether to only list the objects.
+        """
+        targets = [target for stage in stages for target in stage]
+        if preview:
+            names = ", ".join(target.name for target in targets[:PREVIEW_LIMIT])
+            extra = len(targets) - PREVIEW_LIMIT
+            more = f" and {extra} more" if extra > 0 else ""
+            message = f"Would delete {description}: {names}{more}."
+            await log_send(ctx, self.logger, message)
+            return
+
+        async with ProgressReporter(
             ctx,
             self.logger,
-            f"Deleted all roles with base name: *{substring}*",
-        )
+            f"Deleting {description}",
+        ) as progress:
+            start = time.perf_counter()
+            reports = [
+                await self.executor.run(map(ex.delete, stage), progress)
+                for stage in stages
+            ]
+            report = ExecutionReport.combine(reports, time.perf_counter() - start)
+            await progress.finish(report.get_summary())
 
     @commands.hybrid_command()
     @commands.guild_only()
@@ -161,12 +205,6 @@ class Management(commands.Cog):
             ctx.guild.name,
         )
 
-        await log_send(
-            ctx,
-            self.logger,
-            f"*Cloning Channel '{channel.name}' as '{name}'*",
-        )
-
         new_channel = await channel.clone(name=name)
         await log_send(
             ctx,
@@ -208,20 +246,19 @@ class Management(commands.Cog):
             ctx.guild.name,
         )
 
-        await log_send(
-            ctx,
-            self.logger,
-            f"*Cloning Channels from '{base_name}{start}' to '{base_name}{end}'*",
-        )
         channel_names = [f"{base_name}{i}" for i in range(start, end)]
-        for name in channel_names:
-            await channel.clone(name=name)
-            await log_send(ctx, self.logger, f"Cloned channel '{name}.'")
-        await log_send(
+        async with ProgressReporter(
             ctx,
             self.logger,
-            f"*Cloned Channels from '{base_name}{start}' to '{base_name}{end}'*",
-        )
+            f"Cloning Channels from '{base_name}{start}' to '{base_name}{end}'",
+        ) as progress:
+            _, report = await self.provisioner.provision_channels(
+                self.bot.get_cog("Indexing").get_channel_index(ctx.guild),
+                channel,
+                channel_names,
+                progress,
+            )
+            await progress.finish(report.get_summary())
 
     @commands.hybrid_command()
     @commands.guild_only()
@@ -292,26 +329,20 @@ class Management(commands.Cog):
             ctx.guild.name,
         )
 
-        await log_send(
-            ctx,
-            self.logger,
-            f"*Cloning Roles from '{base_name}{start}' to '{base_name}{end}.'*",
-        )
         role_names = [f"{base_name}{i}" for i in range(start, end)]
-
-        for name in role_names:
-            await ctx.guild.create_role(
-                name=name,
-                permissions=role.permissions,
-                color=role.color,
-            )
-            await log_send(ctx, self.logger, f"Cloned role '{name}.'")
-
-        await log_send(
+        async with ProgressReporter(
             ctx,
             self.logger,
-            f"*Cloned Roles from '{base_name}{start}' to '{base_name}{end}.'*",
-        )
+            f"Cloning Roles from '{base_name}{start}' to '{base_name}{end}'",
+        ) as progress:
+            _, report = await self.provisioner.provision_roles(
+                self.bot.get_cog("Indexing").get_role_index(ctx.guild),
+                ctx.guild,
+                role,
+                role_names,
+                progress,
+            )
+            await progress.finish(report.get_summary())
 
     @commands.hybrid_command()
     @commands.guild_only()
@@ -335,20 +366,18 @@ class Management(commands.Cog):
             ctx.guild.name,
         )
 
-        members = ctx.guild.members
-
-        for m in members:
-            if role in m.roles:
-                continue
-            if condition in m.roles:
-                await m.add_roles(role)
-                await log_send(
-                    ctx,
-                    self.logger,
-                    f"Assigned {m.display_name} {role.name}.",
-                )
-
-        await log_send(ctx, self.logger, "Completed Role Assignments.")
+        mutations = [
+            ex.add_roles(m, role)
+            for m in ctx.guild.members
+            if role not in m.roles and condition in m.roles
+        ]
+        async with ProgressReporter(
+            ctx,
+            self.logger,
+            f"Assigning {role.name}",
+        ) as progress:
+            report = await self.executor.run(mutations, progress)
+            await progress.finish(report.get_summary())
 
     @commands.hybrid_command()
     @commands.guild_only()
@@ -376,17 +405,45 @@ class Management(commands.Cog):
             entity.name,
         )
 
-        if isinstance(entity, discord.Member) and entity in channel.members:
+        batch = OverwriteBatch()
+        if not self.add_channel_access(batch, entity, channel):
             name = entity.display_name or entity.name
             await log_send(ctx, self.logger, f"{name} already has access to {channel}.")
             return
 
-        await channel.set_permissions(
-            target=entity,
-            overwrite=dch.get_basic_access_overwrite(channel),
-        )
+        (mutation,) = batch.get_mutations()
+        report = await self.executor.run([mutation])
+        if report.failures:
+            _, error = report.failures[0]
+            message = f"Failed to add {entity.name} to {channel} ({error})."
+            await log_send(ctx, self.logger, message)
+            return
+
+        await log_send(ctx, self.logger, mutation.description)
+
+    def add_channel_access(
+        self,
+        batch: OverwriteBatch,
+        entity: discord.Member | discord.Role,
+        channel: discord.TextChannel | discord.VoiceChannel,
+    ) -> bool:
+        """Queues basic channel access in the batch, if needed.
+
+        Args:
+            batch (OverwriteBatch): The batch of pending overwrites.
+            entity (discord.Member | discord.Role): The member or role to grant access.
+            channel (discord.Channel): The channel to give access to.
+
+        Returns:
+            bool: Whether access was queued, or False if the member has access.
+        """
+        if isinstance(entity, discord.Member):
+            index = self.bot.get_cog("Indexing").get_visibility_index(channel.guild)
+            if index.can_view(entity, channel):
+                return False
 
-        await log_send(ctx, self.logger, f"Added {entity.name} to {channel}.")
+        batch.add(channel, entity, dch.get_basic_access_overwrite(channel))
+        return True
 
 
 async def setup(bot: commands.Bot) -> None:
@@ -1,28 +1,46 @@
 """This package maintains the data models for the program."""
 
 import logging
-from dataclasses import dataclass, field
+import sys
+from array import array
+from collections import Counter
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass, field, fields
+from itertools import compress
 
 import discord
 import discord.utils
-from discord.ext import commands
 
-import marshmallow.utility.processor as pr
+logger = logging.getLogger(__name__)
 
 
-@dataclass(frozen=True)
+def _intern_all(names: Iterable[str]) -> tuple[str, ...]:
+    return tuple(sys.intern(name) for name in names)
+
+
+@dataclass(frozen=True, slots=True)
 class Information:
-    """This represents the information associated with a person."""
+    """This represents the information associated with a person.
+
+    Role and affinity names repeat across a cohort, so they are interned and
+    every sequence is stored as a tuple.
+    """
 
     full_name: str
     email: str
-    role_names: list[str] = field(default_factory=list)
-    aliases: list[str] = field(default_factory=list)
-    affinity_groups: list[str] = field(default_factory=list)
+    role_names: tuple[str, ...] = ()
+    aliases: tuple[str, ...] = ()
+    affinity_groups: tuple[str, ...] = ()
     found: bool = False
 
+    def __post_init__(self) -> None:
+        """Stores the names as tuples, interning role and affinity names."""
+        object.__setattr__(self, "role_names", _intern_all(self.role_names))
+        object.__setattr__(self, "aliases", tuple(self.aliases))
+        object.__setattr__(self, "affinity_groups", _intern_all(self.affinity_groups))
+
 
-@dataclass
+@dataclass(slots=True)
 class GuildPerson:
     """This represents a person matched to a guild member."""
 
@@ -30,49 +48,20 @@ class GuildPerson:
     "The person's information."
     guild_member: discord.Member | None = None
     "The guild member associated with the person."
-    logger: logging.Logger = field(init=False)
-
-    def __post_init__(self) -> None:
-        """Acquires logger for the GuildPerson."""
-        self.logger = logging.getLogger(__name__)
-
-    def set_guild_member(
-        self,
-        members_to_guild_names: dict[discord.Member, list[str]],
-    ) -> None:
-        """Sets guild member associated with the person.
-
-        Utilizes the name-matching algorithm to set the associated
-        guild member. If no match is found, then set to None.
+    guild_roles: tuple[discord.Role | None, ...] = field(default=(), init=False)
+    "The person's designated guild roles."
 
-        Args:
-            members_to_guild_names (dict): Mapping from guild members to guild names.
-        """
-        if not self.info.aliases:
-            self.logger.info(
-                "Cannot set associated guild member when person has no aliases.",
-            )
-            return
-
-        for member, guild_names in members_to_guild_names.items():
-            if pr.is_name_match(guild_names, self.info.aliases):
-                self.guild_member = member
-                return
-
-    def set_guild_roles(self) -> None:
+    def set_guild_roles(self, roles: dict[str, discord.Role]) -> None:
         """Sets person's designated guild roles based on role_names.
 
         Args:
-            override_role (discord.Role | None): A specific role to assign.
+            roles (dict[str, discord.Role]): Mapping from role names to guild roles.
         """
         if not self.guild_member:
-            self.logger.info("Cannot set guild roles for person with no guild member.")
+            logger.info("Cannot set guild roles for person with no guild member.")
             return
 
-        self.guild_roles = [
-            discord.utils.get(self.guild_member.guild.roles, name=role_name)
-            for role_name in self.info.role_names
-        ]
+        self.guild_roles = tuple(roles.get(name) for name in self.info.role_names)
 
     def get_display_name(self) -> str | None:
         """Returns the person's display name on discord or None.
@@ -90,41 +79,6 @@ class GuildPerson:
         """
         return self.guild_member.name if self.guild_member else None
 
-    async def assign_roles(self, ctx: commands.Context) -> None:
-        """Assigns person's guild member their designated roles if possible.
-
-        Logs the assignment. Sends a message to the context channel.
-
-        Args:
-            ctx (commands.Context): The command call context object.
-        """
-        if not self.guild_member:
-            self.logger.info(
-                "%s could not be found on the server.",
-                self.info.full_name,
-            )
-            return
-
-        if not self.guild_roles:
-            self.logger.warning("Guild Roles is None.")
-            return
-
-        for role in self.guild_roles:
-            if role in self.guild_member.roles:
-                self.logger.info(
-                    "%s already has role %s.",
-                    self.info.full_name,
-                    role.name,
-                )
-            else:
-                await self.guild_member.add_roles(role)
-                await ctx.send(f"{self.info.full_name} was newly assigned {role.name}")
-                self.logger.info(
-                    "%s was newly assigned %s.",
-                    self.info.full_name,
-                    role.name,
-                )
-
     def get_metrics(self) -> dict:
         """Returns the metrics associated with a person.
 
@@ -142,5 +96,168 @@ class GuildPerson:
         }
 
 
+_INVERT = bytes([1, 0]) + bytes(254)
+
+REPORT_FIELDS = (
+    "full_name",
+    "display_name",
+    "username",
+    "role_names",
+    "email",
+    "found",
+    "aliases",
+)
+
+
+class Cohort:
+    """This represents a cohort stored column by column.
+
+    Each field of the cohort is held in its own column, and role
+    designations as a flat column of indices into the cohort's role names,
+    so counts, the unmatched filter and role tallies work on whole columns
+    with bytearray.count, itertools.compress and Counter instead of
+    visiting person objects.
+    """
+
+    __slots__ = (
+        "aliases",
+        "display_names",
+        "emails",
+        "found",
+        "full_names",
+        "role_found",
+        "role_indices",
+        "role_names",
+        "role_strings",
+        "usernames",
+    )
+
+    def __init__(self, people: Sequence[GuildPerson]) -> None:
+        """Builds the columns of the cohort.
+
+        Args:
+            people (Sequence[GuildPerson]): The people of the cohort.
+        """
+        self.found = bytearray(bool(p.guild_member) or p.info.found for p in people)
+        "Whether each person was found on the server."
+        self.full_names = [p.info.full_name for p in people]
+        "The full name of each person."
+        self.emails = [p.info.email for p in people]
+        "The email of each person."
+        self.aliases = [",".join(p.info.aliases) for p in people]
+        "The joined aliases of each person."
+        self.role_strings = [",".join(p.info.role_names) for p in people]
+        "The joined role names of each person."
+        self.display_names = [p.get_display_name() for p in people]
+        "The display name of each person's guild member, or None."
+        self.usernames = [p.get_username() for p in people]
+        "The username of each person's guild member, or None."
+
+        lookup: dict[str, int] = {}
+        self.role_names: list[str] = []
+        "The distinct role names of the cohort."
+        self.role_indices = array("I")
+        "The role name index of every designated person-role pair."
+        self.role_found = bytearray()
+        "The found flag of the person of every designated person-role pair."
+        for person, found in zip(people, self.found, strict=True):
+            names = [name for name in person.info.role_names if name]
+            for name in names:
+                if name not in lookup:
+                    lookup[name] = len(self.role_names)
+                    self.role_names.append(name)
+                self.role_indices.append(lookup[name])
+            self.role_found.extend(bytes([found]) * len(names))
+
+    def __len__(self) -> int:
+        """Returns the number of people in the cohort."""
+        return len(self.found)
+
+    def get_counts(self) -> tuple[int, int]:
+        """Returns the found and not found counts of people.
+
+        Returns:
+            tuple[int, int]: The found and not found counts of people.
+        """
+        found = self.found.count(1)
+        return found, len(self) - found
+
+    def get_unmatched(self, column: list) -> list:
+        """Returns the entries of a column belonging to people not found.
+
+        Args:
+            column (list): A column of the cohort, e.g. full_names.
+
+        Returns:
+            list: The entries of the unmatched people, in cohort order.
+        """
+        return list(compress(column, self.found.translate(_INVERT)))
+
+    def get_role_tallies(self) -> dict[str, tuple[int, int]]:
+        """Returns how many people designated each role were found.
+
+        Returns:
+            dict[str, tuple[int, int]]: Mapping of role names to their found
+                and designated counts, in order of first designation.
+        """
+        designated = Counter(self.role_indices)
+        found = Counter(compress(self.role_indices, self.role_found))
+        return {
+            name: (found[i], designated[i]) for i, name in enumerate(self.role_names)
+        }
+
+    def get_report_rows(self) -> list[dict]:
+        """Returns the assignment report row of every person.
+
+        Returns:
+            list[dict]: The report rows, keyed by REPORT_FIELDS.
+        """
+        columns = (
+            self.full_names,
+            self.display_names,
+            self.usernames,
+            self.role_strings,
+            self.emails,
+            map(bool, self.found),
+            self.aliases,
+        )
+        return [
+            dict(zip(REPORT_FIELDS, row, strict=True))
+            for row in zip(*columns, strict=True)
+        ]
+
+
+def get_footprint(people: Sequence[GuildPerson]) -> float:
+    """Returns the measured memory footprint per person in bytes.
+
+    Objects shared between people, such as interned role names, are counted
+    once, and referenced discord objects are not counted.
+
+    Args:
+        people (Sequence[GuildPerson]): The people to measure.
+
+    Returns:
+        float: The average footprint per person in bytes.
+    """
+    if not people:
+        return 0.0
+
+    seen: set[int] = set()
+    total = 0
+    stack: list[object] = [*people, *(p.info for p in people)]
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen:
+            continue
+        seen.add(id(obj))
+        total += sys.getsizeof(obj)
+        if isinstance(obj, Information):
+            stack.extend(getattr(obj, f.name) for f in fields(obj))
+        elif isinstance(obj, tuple):
+            stack.extend(obj)
+
+    return total / len(people)
+
+
 if __name__ == "__main__":
     pass
@@ -7,6 +7,7 @@ from marshmallow.settings.config import (
     get_cogs,
     get_command_prefix,
     get_intents,
+    get_layout,
     get_random_discord_activity,
     get_token,
 )
@@ -18,6 +19,7 @@ __all__ = [
     "get_cogs",
     "get_command_prefix",
     "get_intents",
+    "get_layout",
     "get_random_discord_activity",
     "get_token",
 ]
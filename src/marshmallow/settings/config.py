@@ -102,6 +102,19 @@ def _get_logging_config() -> dict:
     return config
 
 
+def get_layout() -> dict:
+    """Returns the guild layout specification as a dictionary.
+
+    Returns:
+        dict: The guild layout specification.
+    """
+    with open(
+        "src/marshmallow/settings/layout.yml",
+        encoding="UTF-8",
+    ) as stream:
+        return yaml.safe_load(stream)
+
+
 def configure_logging() -> None:
     """Configures logging."""
     config = _get_logging_config()
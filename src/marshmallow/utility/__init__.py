@@ -1,6 +1,9 @@
 """The utility package is responsible for handling data and creating useful objects."""
 
 from marshmallow.utility.dmaps import (
+    ChannelIndex,
+    RoleIndex,
+    VisibilityIndex,
     get_channel_map,
     get_role_map,
 )
@@ -13,6 +16,9 @@ from marshmallow.utility.processor import (
 )
 
 __all__ = [
+    "ChannelIndex",
+    "RoleIndex",
+    "VisibilityIndex",
     "get_basic_embed",
     "get_channel_map",
     "get_member_guild_name_map",
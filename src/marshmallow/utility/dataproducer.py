@@ -6,23 +6,127 @@ custom models.
 """
 
 import csv
+import hashlib
+import io
 import json
 import logging
+import os
+import sqlite3
+from collections.abc import AsyncIterator, Callable, Iterator
 from dataclasses import dataclass, field
+from typing import Any
 
-from marshmallow.models import GuildPerson, Information
+import marshmallow.utility.datawriter as dw
+import marshmallow.utility.offload as ou
+import marshmallow.utility.store as st
+from marshmallow.models import GuildPerson, Information, get_footprint
+from marshmallow.utility.datawriter import ReportBuffer
+from marshmallow.utility.store import Store
+
+
+@dataclass
+class CachedFile:
+    """This represents a parsed file and the state it was parsed from."""
+
+    mtime_ns: int
+    "The modification time of the file when parsed."
+    size: int
+    "The size of the file when parsed."
+    digest: str
+    "The content hash of the file when parsed."
+    records: Any
+    "The parsed records."
+
+
+def _parse_person(row: dict[str, str]) -> Information:
+    return Information(
+        full_name=row["full_name"],
+        email=row["email"],
+        role_names=row.get("role_names", "").split(","),
+        aliases=row["aliases"].split(","),
+        affinity_groups=row.get("affinity_groups", "").split(",")
+        if row.get("affinity_groups", "") != ""
+        else [],
+    )
+
+
+def _parse_people(text: str) -> tuple[Information, ...]:
+    return tuple(_parse_person(row) for row in csv.DictReader(io.StringIO(text)))
+
+
+def _get_people_path(group: str) -> str:
+    return f"../marshmallow-datapipelines/results/{group}.csv"
 
 
 @dataclass
 class DataServer:
     """This class is responsible for reading and serving data to Marshmallow."""
 
+    cache: dict[str, CachedFile] = field(default_factory=dict)
+    "Mapping of file paths to their parsed contents."
+    store: Store = field(default_factory=st.get_store)
+    "The store the reports are read from."
+    buffer: ReportBuffer = field(default_factory=dw.get_report_buffer)
+    "The buffer of reports not yet flushed to the store."
     logger: logging.Logger = field(init=False)
 
     def __post_init__(self) -> None:
         """Acquires logger for the DataServer."""
         self.logger = logging.getLogger(__name__)
 
+    def _load(
+        self,
+        path: str,
+        parse: Callable[[str], Any],
+        encoding: str | None = None,
+    ) -> Any:  # noqa: ANN401
+        """Returns the parsed contents of the file, reparsing only if it changed.
+
+        Args:
+            path (str): The path of the file.
+            parse (Callable[[str], Any]): The parser of the file's text.
+            encoding (str | None): The encoding of the file.
+
+        Returns:
+            Any: The parsed records.
+        """
+        stat = os.stat(path)
+        cached = self.cache.get(path)
+        if cached and (cached.mtime_ns, cached.size) == (
+            stat.st_mtime_ns,
+            stat.st_size,
+        ):
+            return cached.records
+
+        with open(path, encoding=encoding) as data:
+            text = data.read()
+        digest = hashlib.sha256(text.encode()).hexdigest()
+
+        if cached and cached.digest == digest:
+            self.logger.info("%s was touched but is unchanged.", path)
+            cached.mtime_ns, cached.size = stat.st_mtime_ns, stat.st_size
+            return cached.records
+
+        if not cached:
+            reason = "not yet cached"
+        else:
+            reason = f"content changed, {cached.size} to {stat.st_size} bytes"
+        self.logger.info("Parsing %s (%s).", path, reason)
+
+        records = parse(text)
+        self.cache[path] = CachedFile(stat.st_mtime_ns, stat.st_size, digest, records)
+        return records
+
+    def _log_footprint(self, group: str, people: list[GuildPerson]) -> None:
+        # Measuring walks every object of the cohort, so it only runs when
+        # debugging rather than on every load.
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug(
+                "People of %s take %.0f bytes/person.",
+                group,
+                get_footprint(people),
+            )
+
     def get_people(self, group: str) -> list[GuildPerson]:
         """Returns the people associated with the group.
 
@@ -32,48 +136,150 @@ class DataServer:
         Returns:
             list[GuildPerson]: The people associated with the group.
         """
-        with open(f"../marshmallow-datapipelines/results/{group}.csv") as csv_file:
-            self.logger.info("Retrieved People of %s.", group)
-            reader = csv.DictReader(csv_file)
-            return [
-                GuildPerson(
-                    Information(
-                        full_name=row["full_name"],
-                        email=row["email"],
-                        role_names=row.get("role_names", "").split(","),
-                        aliases=row["aliases"].split(","),
-                        affinity_groups=row.get("affinity_groups", "").split(",")
-                        if row.get("affinity_groups", "") != ""
-                        else [],
-                    ),
-                )
-                for row in reader
-            ]
-
-    def get_report_people(self, group: str) -> list[GuildPerson]:
-        """Returns the people associated with the group report.
+        infos = self._load(_get_people_path(group), _parse_people)
+        people = [GuildPerson(info) for info in infos]
+        self.logger.info("Retrieved %d People of %s.", len(people), group)
+        self._log_footprint(group, people)
+        return people
+
+    def iter_people(
+        self,
+        group: str,
+        chunk_size: int = 250,
+    ) -> Iterator[list[GuildPerson]]:
+        """Yields the people associated with the group in chunks.
+
+        An unchanged file is served from the cache; otherwise rows are parsed
+        as they are read and the cache is filled once the file is exhausted.
+
+        Args:
+            group (str): The group to retrieve.
+            chunk_size (int): The number of people per chunk.
+
+        Yields:
+            list[GuildPerson]: The next chunk of people.
+        """
+        path = _get_people_path(group)
+        stat = os.stat(path)
+        cached = self.cache.get(path)
+        if cached and (cached.mtime_ns, cached.size) == (
+            stat.st_mtime_ns,
+            stat.st_size,
+        ):
+            for i in range(0, len(cached.records), chunk_size):
+                yield [GuildPerson(info) for info in cached.records[i : i + chunk_size]]
+            return
+
+        self.logger.info("Streaming %s.", path)
+        digest = hashlib.sha256()
+        infos: list[Information] = []
+        with open(path) as csv_file:
+            lines = (digest.update(line.encode()) or line for line in csv_file)
+            chunk = []
+            for row in csv.DictReader(lines):
+                infos.append(_parse_person(row))
+                chunk.append(GuildPerson(infos[-1]))
+                if len(chunk) == chunk_size:
+                    yield chunk
+                    chunk = []
+            if chunk:
+                yield chunk
+
+        self.cache[path] = CachedFile(
+            stat.st_mtime_ns,
+            stat.st_size,
+            digest.hexdigest(),
+            tuple(infos),
+        )
+        self.logger.info("Retrieved %d People of %s.", len(infos), group)
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self._log_footprint(group, [GuildPerson(info) for info in infos])
+
+    async def aiter_people(
+        self,
+        group: str,
+        chunk_size: int = 250,
+    ) -> AsyncIterator[list[GuildPerson]]:
+        """Yields the people associated with the group in chunks, off the loop.
+
+        Args:
+            group (str): The group to retrieve.
+            chunk_size (int): The number of people per chunk.
+
+        Yields:
+            list[GuildPerson]: The next chunk of people.
+        """
+        chunks = self.iter_people(group, chunk_size)
+        while chunk := await ou.run_io(next, chunks, None):
+            yield chunk
+
+    async def aget_people(self, group: str) -> list[GuildPerson]:
+        """Returns the people associated with the group, off the loop.
+
+        Args:
+            group (str): The group to retrieve.
+
+        Returns:
+            list[GuildPerson]: The people associated with the group.
+        """
+        return await ou.run_io(self.get_people, group)
+
+    def get_unmatched_people(self, group: str) -> list[sqlite3.Row]:
+        """Returns the people of the group report not found on the server.
+
+        Args:
+            group (str): The group to retrieve.
+
+        Returns:
+            list[sqlite3.Row]: The full names, aliases and role names of the
+                unmatched people.
+        """
+        self.buffer.flush()
+        rows = self.store.get_unmatched(group)
+        self.logger.info("Retrieved %d Unmatched People of %s.", len(rows), group)
+        return rows
+
+    async def aget_unmatched_people(self, group: str) -> list[sqlite3.Row]:
+        """Returns the people of the group report not found on the server, off the loop.
 
         Args:
             group (str): The group to retrieve.
 
         Returns:
-            list[GuildPerson]: The people associated with the group report.
+            list[sqlite3.Row]: The full names, aliases and role names of the
+                unmatched people.
         """
-        with open(f"assignments/{group}report.csv") as csv_file:
-            self.logger.info("Retrieved Assignment Report People of %s.", group)
-            reader = csv.DictReader(csv_file)
-            return [
-                GuildPerson(
-                    Information(
-                        full_name=row["full_name"],
-                        email=row["email"],
-                        role_names=row["role_names"].split(","),
-                        aliases=row["aliases"].split(","),
-                        found=(row["found"] == "True"),
-                    ),
-                )
-                for row in reader
-            ]
+        return await ou.run_io(self.get_unmatched_people, group)
+
+    def get_message_counts(self, report: str, limit: int = -1) -> list[sqlite3.Row]:
+        """Returns the message counts of the report, most active first.
+
+        Args:
+            report (str): The name of the message report.
+            limit (int): The maximum number of rows, or -1 for all of them.
+
+        Returns:
+            list[sqlite3.Row]: The names, usernames and counts of members.
+        """
+        rows = self.store.get_message_counts(report, limit)
+        self.logger.info("Retrieved %d Message Counts of %s.", len(rows), report)
+        return rows
+
+    async def aget_message_counts(
+        self,
+        report: str,
+        limit: int = -1,
+    ) -> list[sqlite3.Row]:
+        """Returns the message counts of the report, off the loop.
+
+        Args:
+            report (str): The name of the message report.
+            limit (int): The maximum number of rows, or -1 for all of them.
+
+        Returns:
+            list[sqlite3.Row]: The names, usernames and counts of members.
+        """
+        return await ou.run_io(self.get_message_counts, report, limit)
 
     def get_welcome_messages(self) -> dict:
         """Returns a mapping of welcome messages.
@@ -81,11 +287,19 @@ class DataServer:
         Returns:
             dict: The mapping of welcome messages.
         """
-        with open(
+        return self._load(
             "src/marshmallow/settings/resources/welcomes.json",
-            encoding="UTF-8",
-        ) as data:
-            return json.load(data)
+            json.loads,
+            "UTF-8",
+        )
+
+    async def aget_welcome_messages(self) -> dict:
+        """Returns a mapping of welcome messages, off the loop.
+
+        Returns:
+            dict: The mapping of welcome messages.
+        """
+        return await ou.run_io(self.get_welcome_messages)
 
 
 if __name__ == "__main__":
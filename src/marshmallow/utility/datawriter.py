@@ -1,60 +1,265 @@
-"""This module is reponsble for writing data to output."""
+"""This module is reponsble for writing data to output.
 
-import csv
+Assignment reports are written behind: each write queues the report in a
+buffer shared by every cog, and the buffer is flushed to the store on a
+timer, before reads, and on shutdown. A flush writes only the rows that
+changed since the last flush, in one transaction per group.
+"""
+
+import functools
 import logging
+import threading
+from collections.abc import Iterable, Mapping
 from dataclasses import dataclass, field
 
-from marshmallow.models import GuildPerson
+import marshmallow.utility.offload as ou
+import marshmallow.utility.store as st
+from marshmallow.models import Cohort
+from marshmallow.utility.store import Store
+
+Row = tuple[object, ...]
+
+
+def _get_row(row: Mapping[str, object]) -> Row:
+    return tuple(int(row[c]) if c == "found" else row[c] for c in st.ASSIGNMENT_COLUMNS)
+
+
+@dataclass
+class ReportBuffer:
+    """This class is responsible for writing assignment reports behind."""
+
+    store: Store = field(default_factory=st.get_store)
+    "The store the reports are flushed to."
+    pending: dict[str, dict[str, Row]] = field(default_factory=dict)
+    "Mapping of groups to the queued rows of each email."
+    members: dict[str, frozenset[str]] = field(default_factory=dict)
+    "Mapping of groups to the emails of their latest report."
+    flushed: dict[str, dict[str, Row]] = field(default_factory=dict)
+    "Mapping of groups to the stored rows of each email."
+    lock: threading.Lock = field(default_factory=threading.Lock)
+    "The lock serializing queueing and flushing."
+    logger: logging.Logger = field(init=False)
+
+    def __post_init__(self) -> None:
+        """Acquires logger for the ReportBuffer."""
+        self.logger = logging.getLogger(__name__)
+
+    def put(
+        self,
+        group: str,
+        rows: Iterable[Mapping[str, object]],
+        emails: Iterable[str],
+    ) -> None:
+        """Queues the report rows of the group.
+
+        Args:
+            group (str): The assignment group.
+            rows (Iterable[Mapping]): The report rows, keyed by ASSIGNMENT_COLUMNS.
+            emails (Iterable[str]): The emails of everyone in the group.
+        """
+        queued = {row["email"]: _get_row(row) for row in rows}
+        with self.lock:
+            self.pending.setdefault(group, {}).update(queued)
+            self.members[group] = frozenset(emails)
+
+    def _get_flushed(self, group: str) -> dict[str, Row]:
+        if group not in self.flushed:
+            rows = self.store.get_assignments(group)
+            self.flushed[group] = {row["email"]: tuple(row) for row in rows}
+        return self.flushed[group]
+
+    def flush(self) -> int:
+        """Writes the rows that changed since the last flush.
+
+        A group leaves the queue only once it is written, so a failed write
+        keeps it and every group after it for the next flush.
+
+        Returns:
+            int: The number of rows written.
+        """
+        written = 0
+        with self.lock:
+            for group, queued in list(self.pending.items()):
+                flushed = self._get_flushed(group)
+                changed = {e: r for e, r in queued.items() if flushed.get(e) != r}
+                members = self.members[group]
+                removed = flushed.keys() - members
+                if not changed and not removed:
+                    del self.pending[group]
+                    continue
+
+                rows = (
+                    dict(zip(st.ASSIGNMENT_COLUMNS, row, strict=True))
+                    for row in changed.values()
+                )
+                self.store.write_assignments(group, rows, members if removed else None)
+                del self.pending[group]
+                flushed.update(changed)
+                for email in removed:
+                    del flushed[email]
+                written += len(changed)
+                self.logger.info(
+                    "Flushed '%s' report: %d of %d rows changed, %d removed.",
+                    group,
+                    len(changed),
+                    len(queued),
+                    len(removed),
+                )
+
+        return written
+
+
+@functools.cache
+def get_report_buffer() -> ReportBuffer:
+    """Returns the bot's shared report buffer.
+
+    Returns:
+        ReportBuffer: The shared report buffer.
+    """
+    return ReportBuffer()
 
 
 @dataclass
 class DataWriter:
     """This class is responsible for writing data to output."""
 
+    store: Store = field(default_factory=st.get_store)
+    "The store the reports are written to."
+    buffer: ReportBuffer = field(default_factory=get_report_buffer)
+    "The buffer assignment reports are written behind."
     logger: logging.Logger = field(init=False)
 
     def __post_init__(self) -> None:
         """Acquires logger for the DataWriter."""
         self.logger = logging.getLogger(__name__)
 
-    def write_assignment_report(self, people: list[GuildPerson], csv_name: str) -> None:
-        """Writes the metrics to a csv file.
+    def write_assignment_report(
+        self,
+        cohort: Cohort,
+        group: str,
+        *,
+        export: bool = False,
+    ) -> None:
+        """Queues the metrics to be written to the store.
+
+        Args:
+            cohort (Cohort): The people assigned roles.
+            group (str): The assignment group.
+            export (bool): Whether to also export the report to a csv file.
+        """
+        self.buffer.put(group, cohort.get_report_rows(), cohort.emails)
+        self.logger.info("Queued '%s' Assignment Report.", group)
+
+        if export:
+            self.export_assignment_report(group)
+
+    async def awrite_assignment_report(
+        self,
+        cohort: Cohort,
+        group: str,
+        *,
+        export: bool = False,
+    ) -> None:
+        """Queues the metrics to be written to the store, off the loop.
+
+        Args:
+            cohort (Cohort): The people assigned roles.
+            group (str): The assignment group.
+            export (bool): Whether to also export the report to a csv file.
+        """
+        await ou.run_io(self.write_assignment_report, cohort, group, export=export)
+
+    def export_assignment_report(self, group: str) -> str:
+        """Exports the stored assignment report to a csv file.
 
         Args:
-            people (list[GuildPerson]): The people assigned roles.
-            csv_name (str): The name of csv file.
+            group (str): The assignment group.
+
+        Returns:
+            str: The path of the csv file.
         """
-        with open(f"assignments/{csv_name}report.csv", "w") as csv_file:
-            fieldnames = [
-                "full_name",
-                "display_name",
-                "username",
-                "role_names",
-                "email",
-                "found",
-                "aliases",
-            ]
-            writer = csv.DictWriter(csv_file, fieldnames=fieldnames)
+        self.buffer.flush()
+        path = f"assignments/{group}report.csv"
+        st.export_csv(self.store.get_assignments(group), st.ASSIGNMENT_COLUMNS, path)
+        self.logger.info("Exported '%s' Assignment Report.", group)
+        return path
 
-            writer.writeheader()
-            for p in people:
-                writer.writerow(p.get_metrics())
+    async def aexport_assignment_report(self, group: str) -> str:
+        """Exports the stored assignment report to a csv file, off the loop.
 
-            self.logger.info("Wrote '%s' Assignment Report.", csv_name)
+        Args:
+            group (str): The assignment group.
 
-    def write_message_counts(self, message_counts: dict, csv_name: str) -> None:
-        """Writes the message counts to a csv file.
+        Returns:
+            str: The path of the csv file.
+        """
+        return await ou.run_io(self.export_assignment_report, group)
+
+    def write_message_counts(
+        self,
+        message_counts: dict,
+        report: str,
+        *,
+        export: bool = False,
+    ) -> None:
+        """Writes the message counts to the store.
 
         Args:
             message_counts (dict): The message counts.
-            csv_name (str): The name of the csv.
+            report (str): The name of the report.
+            export (bool): Whether to also export the report to a csv file.
         """
-        with open(f"messages/{csv_name}.csv", "w") as f:
-            w = csv.writer(f)
-            w.writerow(("name", "username", "count"))
-            w.writerows([(*person, count) for person, count in message_counts.items()])
+        self.store.write_message_counts(report, message_counts)
+        self.logger.info("Wrote '%s' Message Report.", report)
+
+        if export:
+            self.export_message_counts(report)
+
+    async def awrite_message_counts(
+        self,
+        message_counts: dict,
+        report: str,
+        *,
+        export: bool = False,
+    ) -> None:
+        """Writes the message counts to the store, off the loop.
 
-        self.logger.info("Wrote '%s' Message Report.", csv_name)
+        Args:
+            message_counts (dict): The message counts.
+            report (str): The name of the report.
+            export (bool): Whether to also export the report to a csv file.
+        """
+        await ou.run_io(
+            self.write_message_counts,
+            message_counts,
+            report,
+            export=export,
+        )
+
+    def export_message_counts(self, report: str) -> str:
+        """Exports the stored message counts to a csv file.
+
+        Args:
+            report (str): The name of the report.
+
+        Returns:
+            str: The path of the csv file.
+        """
+        path = f"messages/{report}.csv"
+        st.export_csv(self.store.get_message_counts(report), st.MESSAGE_COLUMNS, path)
+        self.logger.info("Exported '%s' Message Report.", report)
+        return path
+
+    async def aexport_message_counts(self, report: str) -> str:
+        """Exports the stored message counts to a csv file, off the loop.
+
+        Args:
+            report (str): The name of the report.
+
+        Returns:
+            str: The path of the csv file.
+        """
+        return await ou.run_io(self.export_message_counts, report)
 
 
 if __name__ == "__main__":
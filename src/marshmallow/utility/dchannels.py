@@ -11,15 +11,27 @@ def get_basic_access_overwrite(
     Args:
         channel (discord.TextChannel | discord.VoiceChannel): The channel to overwrite.
 
+    Returns:
+        PermissionOverwrite: The overwrite.
+    """
+    return get_access_overwrite(channel.type)
+
+
+def get_access_overwrite(kind: discord.ChannelType) -> discord.PermissionOverwrite:
+    """Returns a basic access overwrite based on channel type.
+
+    Args:
+        kind (discord.ChannelType): The type of the channel to overwrite.
+
     Returns:
         PermissionOverwrite: The overwrite.
     """
     overwrite = discord.PermissionOverwrite()
-    if isinstance(channel, discord.TextChannel):
+    if kind in {discord.ChannelType.text, discord.ChannelType.news}:
         overwrite.send_messages = True
         overwrite.read_messages = True
         overwrite.read_message_history = True
-    if isinstance(channel, discord.VoiceChannel):
+    if kind == discord.ChannelType.voice:
         overwrite.connect = True
         overwrite.use_soundboard = True
         overwrite.use_voice_activation = True
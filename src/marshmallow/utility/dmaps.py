@@ -1,12 +1,214 @@
 """The dmaps module is responsible for producing and constructing maps for discord objects."""  # noqa: E501
 
 import logging
+from collections.abc import Iterable
 
 import discord
 from discord.ext import commands
 
 logger = logging.getLogger(__name__)
 
+VIEW_CHANNEL = discord.Permissions(view_channel=True).value
+ADMINISTRATOR = discord.Permissions(administrator=True).value
+
+
+class RoleIndex:
+    """A name to role index of a guild.
+
+    The index is built once per guild and shared by every lookup in a run,
+    rather than scanning the guild's roles for each name.
+    """
+
+    def __init__(self, roles: Iterable[discord.Role]) -> None:
+        """Builds the index over the roles.
+
+        Args:
+            roles (Iterable[discord.Role]): The guild roles, in guild order.
+        """
+        self.roles: dict[str, discord.Role] = {}
+        "Mapping of role names to the first role of that name."
+        for role in roles:
+            self.roles.setdefault(role.name, role)
+
+    def get(self, name: str) -> discord.Role | None:
+        """Returns the role with the name or None.
+
+        Args:
+            name (str): The role name.
+
+        Returns:
+            discord.Role | None: The role or None.
+        """
+        return self.roles.get(name)
+
+
+class ChannelIndex:
+    """A name to channel index of a guild.
+
+    The index is built once per guild and shared by every lookup in a run,
+    rather than scanning the guild's channels for each name.
+    """
+
+    def __init__(self, channels: Iterable[discord.abc.GuildChannel]) -> None:
+        """Builds the index over the channels.
+
+        Args:
+            channels (Iterable[discord.abc.GuildChannel]): The guild channels,
+                in guild order.
+        """
+        self.channels: dict[str, discord.abc.GuildChannel] = {}
+        "Mapping of channel names to the first channel of that name."
+        for channel in channels:
+            self.channels.setdefault(channel.name, channel)
+
+    def get(self, name: str) -> discord.abc.GuildChannel | None:
+        """Returns the channel with the name or None.
+
+        Args:
+            name (str): The channel name.
+
+        Returns:
+            discord.abc.GuildChannel | None: The channel or None.
+        """
+        return self.channels.get(name)
+
+
+def _get_overwrite_values(
+    channel: discord.abc.GuildChannel,
+) -> dict[int, tuple[int, int]]:
+    overwrites = {}
+    for target, overwrite in channel.overwrites.items():
+        allow, deny = overwrite.pair()
+        overwrites[target.id] = (allow.value, deny.value)
+    return overwrites
+
+
+class VisibilityIndex:
+    """A channel to viewing members index of a guild.
+
+    Each channel's viewers are resolved once from its overwrites and the
+    members' roles, the same way discord resolves permissions, and kept
+    as a set of member ids, so checking whether a member can see a
+    channel does not recompute the permissions of the whole guild.
+    """
+
+    def __init__(self, guild: discord.Guild) -> None:
+        """Instantiates an empty index of the guild.
+
+        Args:
+            guild (discord.Guild): The guild.
+        """
+        self.guild: discord.Guild = guild
+        "The indexed guild."
+        self.viewers: dict[int, set[int]] = {}
+        "Mapping of channel ids to the ids of the members who can view them."
+
+    def _can_view(
+        self,
+        member: discord.Member,
+        overwrites: dict[int, tuple[int, int]],
+    ) -> bool:
+        if member.id == self.guild.owner_id:
+            return True
+
+        roles = member.roles
+        permissions = 0
+        for role in roles:
+            permissions |= role.permissions.value
+        if permissions & ADMINISTRATOR:
+            return True
+
+        allow, deny = overwrites.get(self.guild.id, (0, 0))
+        permissions = (permissions & ~deny) | allow
+        allow = deny = 0
+        for role in roles[1:]:
+            role_allow, role_deny = overwrites.get(role.id, (0, 0))
+            allow |= role_allow
+            deny |= role_deny
+        permissions = (permissions & ~deny) | allow
+        allow, deny = overwrites.get(member.id, (0, 0))
+        permissions = (permissions & ~deny) | allow
+        return bool(permissions & VIEW_CHANNEL)
+
+    def get_viewers(self, channel: discord.abc.GuildChannel) -> set[int]:
+        """Returns the ids of the members who can view the channel.
+
+        Args:
+            channel (discord.abc.GuildChannel): The channel.
+
+        Returns:
+            set[int]: The member ids.
+        """
+        if channel.id not in self.viewers:
+            overwrites = _get_overwrite_values(channel)
+            self.viewers[channel.id] = {
+                m.id for m in self.guild.members if self._can_view(m, overwrites)
+            }
+            logger.info(
+                "Indexed %d viewers of %s.",
+                len(self.viewers[channel.id]),
+                channel.name,
+            )
+        return self.viewers[channel.id]
+
+    def can_view(
+        self,
+        member: discord.Member,
+        channel: discord.abc.GuildChannel,
+    ) -> bool:
+        """Returns whether the member can view the channel.
+
+        Args:
+            member (discord.Member): The member.
+            channel (discord.abc.GuildChannel): The channel.
+
+        Returns:
+            bool: Whether the member can view the channel.
+        """
+        return member.id in self.get_viewers(channel)
+
+    def get_members(self, channel: discord.abc.GuildChannel) -> list[discord.Member]:
+        """Returns the members who can view the channel.
+
+        Args:
+            channel (discord.abc.GuildChannel): The channel.
+
+        Returns:
+            list[discord.Member]: The members.
+        """
+        members = (self.guild.get_member(i) for i in self.get_viewers(channel))
+        return [m for m in members if m]
+
+    def update_member(self, member: discord.Member) -> None:
+        """Refreshes the member in every indexed channel.
+
+        Args:
+            member (discord.Member): The joined or updated member.
+        """
+        for channel_id, viewers in self.viewers.items():
+            channel = self.guild.get_channel(channel_id)
+            if channel and self._can_view(member, _get_overwrite_values(channel)):
+                viewers.add(member.id)
+            else:
+                viewers.discard(member.id)
+
+    def remove_member(self, member: discord.Member) -> None:
+        """Removes the member from every indexed channel.
+
+        Args:
+            member (discord.Member): The departed member.
+        """
+        for viewers in self.viewers.values():
+            viewers.discard(member.id)
+
+    def invalidate(self, channel: discord.abc.GuildChannel) -> None:
+        """Drops the viewers of the channel, to be resolved again when needed.
+
+        Args:
+            channel (discord.abc.GuildChannel): The changed channel.
+        """
+        self.viewers.pop(channel.id, None)
+
 
 async def get_channel_map(
     ctx: commands.Context,
@@ -38,19 +240,24 @@ async def get_channel_map(
 async def get_role_map(
     ctx: commands.Context,
     roles: list[str],
+    index: RoleIndex | None = None,
 ) -> dict[str, discord.Role | None]:
     """Returns a map between role names and their corresponding discord object.
 
     Args:
         ctx (commands.Context): The command context object.
         roles (list[str]): The desired roles.
+        index (RoleIndex | None): The guild's role index to resolve names with
+            before falling back to conversion.
 
     Returns:
         dict[str, discord.GuildChannel]: The role object mapping.
     """
     role_map: dict[str, discord.Role | None] = {}
     for role in roles:
-        guild_role = await discord.ext.commands.RoleConverter().convert(ctx, role)
+        guild_role = index.get(role) if index else None
+        if not guild_role:
+            guild_role = await discord.ext.commands.RoleConverter().convert(ctx, role)
         if not guild_role:
             logger.warning("No associated guild role with %s.", role)
         role_map[role] = guild_role
@@ -2,11 +2,17 @@
 
 import datetime as dt
 import logging
+import sqlite3
+from collections.abc import Mapping, Sequence
+from typing import Any
 
 import discord
 from discord import Color, Embed
 from discord.ext import commands
 
+PREVIEW_LIMIT = 20
+"The maximum number of objects named in a preview."
+
 
 class DateTimeConverter:
     """Converts a string to a datetime."""
@@ -65,6 +71,10 @@ def get_assignment_summary_embed(
     ctx: commands.Context,
     found: int,
     not_found: int,
+    role_tallies: Mapping[str, tuple[int, int]] | None = None,
+    unmatched: Sequence[str] = (),
+    *,
+    limit: int = PREVIEW_LIMIT,
 ) -> Embed:
     """Sends assignment summary to context channel based on assignment stats.
 
@@ -72,6 +82,9 @@ def get_assignment_summary_embed(
         ctx (commands.Context): The command context.
         found (int): The count of people found.
         not_found (int): The count of people not found.
+        role_tallies (Mapping | None): The found and designated counts of each role.
+        unmatched (Sequence[str]): The names of the people not found.
+        limit (int): The maximum number of roles and names listed.
     """
     embed = get_basic_embed(title="Role Assignment Summary")
 
@@ -80,26 +93,37 @@ def get_assignment_summary_embed(
     if ctx.guild:
         embed.add_field(name="People on Server:", value=str(ctx.guild.member_count))
 
+    if role_tallies:
+        lines = [f"{r}: {f}/{n}" for r, (f, n) in list(role_tallies.items())[:limit]]
+        if len(role_tallies) > limit:
+            lines.append(f"...and {len(role_tallies) - limit} more.")
+        embed.add_field(name="Found per Role:", value="\n".join(lines)[:1024])
+
+    if unmatched:
+        listed = "\n".join(unmatched[:limit])
+        if len(unmatched) > limit:
+            listed += f"\n...and {len(unmatched) - limit} more."
+        embed.add_field(name="Not Found:", value=listed[:1024], inline=False)
+
     return embed
 
 
 def get_failed_assignments_embed(
-    people: list,
+    unmatched: list[sqlite3.Row],
     assignment_group: str,
 ) -> Embed:
     """Returns unmatched people embed.
 
     Args:
-        people (list): The list of people.
+        unmatched (list[sqlite3.Row]): The unmatched people of the assignment group.
         assignment_group (str): The assignment group.
 
     Returns:
         Embed: The failed assignments embed.
     """
-    unmatched = [p for p in people if not p.info.found]
-    names = [p.info.full_name for p in unmatched]
-    aliases = [",".join(p.info.aliases) for p in unmatched]
-    roles = [",".join(p.info.role_names) for p in unmatched]
+    names = [row["full_name"] for row in unmatched]
+    aliases = [row["aliases"] for row in unmatched]
+    roles = [row["role_names"] for row in unmatched]
 
     embed = get_basic_embed(f"Unmatched Person Report: {assignment_group.capitalize()}")
     embed.add_field(
@@ -117,5 +141,113 @@ def get_failed_assignments_embed(
     return embed
 
 
+def get_message_counts_embed(
+    counts: Sequence[Mapping[str, Any]],
+    report: str,
+) -> Embed:
+    """Returns the most active members embed.
+
+    Args:
+        counts (Sequence[Mapping]): The message counts, most active first.
+        report (str): The name of the message report.
+
+    Returns:
+        Embed: The message counts embed.
+    """
+    embed = get_basic_embed(f"Message Report: {report}")
+    if not counts:
+        embed.add_field(name="Messages:", value="No messages")
+        return embed
+
+    embed.add_field(
+        name="Name:",
+        value="\n".join(row["name"] for row in counts),
+    )
+    embed.add_field(
+        name="Messages:",
+        value="\n".join(str(row["count"]) for row in counts),
+    )
+    return embed
+
+
+def get_window_label(start: dt.datetime, end: dt.datetime) -> str:
+    """Returns a label of the time window.
+
+    Args:
+        start (dt.datetime): The start of the window.
+        end (dt.datetime): The end of the window.
+
+    Returns:
+        str: The label of the window.
+    """
+    return f"{start.strftime('%m/%d/%y %I:%M%p')} to {end.strftime('%m/%d/%y %I:%M%p')}"
+
+
+def get_activity_rollup_embed(
+    rollup: list[tuple[dt.datetime, int]],
+    report: str,
+    limit: int = 60,
+) -> Embed:
+    """Returns the message totals per period embed.
+
+    Only the most recent periods are listed, to stay within discord's
+    field length limit.
+
+    Args:
+        rollup (list[tuple[dt.datetime, int]]): The start and message total of
+            each period.
+        report (str): The name of the activity report.
+        limit (int): The maximum number of periods listed.
+
+    Returns:
+        Embed: The activity rollup embed.
+    """
+    embed = get_basic_embed(f"Activity Report: {report}")
+    if len(rollup) > limit:
+        embed.description = f"Showing the last {limit} of {len(rollup)} periods."
+        rollup = rollup[-limit:]
+    if not rollup:
+        embed.add_field(name="Messages:", value="No messages")
+        return embed
+
+    embed.add_field(
+        name="Period:",
+        value="\n".join(start.strftime("%m/%d/%y") for start, _ in rollup),
+    )
+    embed.add_field(
+        name="Messages:",
+        value="\n".join(str(total) for _, total in rollup),
+    )
+    return embed
+
+
+def get_channel_viewers_embed(
+    members: list[discord.Member],
+    channel: discord.abc.GuildChannel,
+    limit: int = 50,
+) -> Embed:
+    """Returns the embed of members who can view a channel.
+
+    Args:
+        members (list[discord.Member]): The members who can view the channel.
+        channel (discord.abc.GuildChannel): The channel.
+        limit (int): The maximum number of names listed.
+
+    Returns:
+        Embed: The channel viewers embed.
+    """
+    embed = get_basic_embed(
+        f"Viewers of {channel.name}",
+        f"{len(members)} members can view this channel.",
+    )
+    names = sorted(member.display_name for member in members)
+    listed = "\n".join(names[:limit])
+    if len(names) > limit:
+        listed += f"\n...and {len(names) - limit} more."
+    if listed:
+        embed.add_field(name="Display Names", value=listed[:1024])
+    return embed
+
+
 if __name__ == "__main__":
     pass
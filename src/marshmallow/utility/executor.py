@@ -0,0 +1,289 @@
+"""The executor module is responsible for running bulk discord mutations.
+
+Mutations are grouped by the rate-limit bucket of their route and run
+with bounded concurrency per bucket, so bulk commands use the headroom
+of each bucket instead of awaiting one API call at a time. discord.py
+still handles the rate limits themselves, and mutations failing with a
+server error are retried with backoff.
+"""
+
+import asyncio
+import logging
+import time
+from collections.abc import Awaitable, Callable, Iterable
+from dataclasses import dataclass, field
+from typing import Any, Self
+
+import discord
+
+from marshmallow.utility.progress import ProgressReporter
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Mutation:
+    """This represents a single discord API mutation."""
+
+    bucket: str
+    "The rate-limit bucket of the mutation's route."
+    description: str
+    "A description of the mutation for logs and reports."
+    action: Callable[[], Awaitable[Any]]
+    "The coroutine function performing the mutation."
+
+
+def add_roles(member: discord.Member, *roles: discord.Role) -> Mutation:
+    """Returns a mutation adding roles to a member.
+
+    Args:
+        member (discord.Member): The member to add roles to.
+        *roles (discord.Role): The roles to add.
+
+    Returns:
+        Mutation: The mutation.
+    """
+    names = ", ".join(role.name for role in roles)
+    return Mutation(
+        bucket=f"add_roles:{member.guild.id}",
+        description=f"Assigned {member.display_name} {names}.",
+        action=lambda: member.add_roles(*roles),
+    )
+
+
+def set_permissions(
+    channel: discord.abc.GuildChannel,
+    target: discord.Member | discord.Role,
+    overwrite: discord.PermissionOverwrite,
+) -> Mutation:
+    """Returns a mutation setting a permission overwrite on a channel.
+
+    Args:
+        channel (discord.abc.GuildChannel): The channel to overwrite.
+        target (discord.Member | discord.Role): The member or role to overwrite.
+        overwrite (discord.PermissionOverwrite): The overwrite.
+
+    Returns:
+        Mutation: The mutation.
+    """
+    return Mutation(
+        bucket=f"set_permissions:{channel.id}",
+        description=f"Added {target.name} to {channel}.",
+        action=lambda: channel.set_permissions(target, overwrite=overwrite),
+    )
+
+
+def create_role(guild: discord.Guild, role: discord.Role, name: str) -> Mutation:
+    """Returns a mutation creating a role cloned from another.
+
+    Args:
+        guild (discord.Guild): The guild to create the role in.
+        role (discord.Role): The role to clone from.
+        name (str): The name of the new role.
+
+    Returns:
+        Mutation: The mutation.
+    """
+    return Mutation(
+        bucket=f"create_role:{guild.id}",
+        description=f"Cloned role '{name}' from '{role.name}'.",
+        action=lambda: guild.create_role(
+            name=name,
+            permissions=role.permissions,
+            color=role.color,
+        ),
+    )
+
+
+def clone(
+    channel: discord.TextChannel | discord.VoiceChannel,
+    name: str,
+) -> Mutation:
+    """Returns a mutation cloning a channel.
+
+    Args:
+        channel (discord.TextChannel | discord.VoiceChannel): The channel to clone.
+        name (str): The name of the new channel.
+
+    Returns:
+        Mutation: The mutation.
+    """
+    return Mutation(
+        bucket=f"create_channel:{channel.guild.id}",
+        description=f"Cloned channel '{name}' from '{channel.name}'.",
+        action=lambda: channel.clone(name=name),
+    )
+
+
+async def _delete(target: discord.abc.GuildChannel | discord.Role) -> None:
+    try:
+        await target.delete()
+    except discord.NotFound:
+        logger.info("'%s' was already deleted.", target.name)
+
+
+def delete(target: discord.abc.GuildChannel | discord.Role) -> Mutation:
+    """Returns a mutation deleting a channel or role.
+
+    Deleting an object that is already gone succeeds, so a deletion can be
+    safely retried or re-run.
+
+    Args:
+        target (discord.abc.GuildChannel | discord.Role): The object to delete.
+
+    Returns:
+        Mutation: The mutation.
+    """
+    kind = "role" if isinstance(target, discord.Role) else "channel"
+    return Mutation(
+        bucket=f"delete_{kind}:{target.guild.id}",
+        description=f"Deleted {kind} '{target.name}'.",
+        action=lambda: _delete(target),
+    )
+
+
+@dataclass
+class ExecutionReport:
+    """This represents the outcome of a batch of mutations."""
+
+    results: list[Any]
+    "The result of each mutation, or None if it failed."
+    failures: list[tuple[Mutation, discord.HTTPException]]
+    "The failed mutations and their errors."
+    elapsed: float
+    "The wall time of the batch in seconds."
+
+    @classmethod
+    def combine(cls, reports: list["ExecutionReport"], elapsed: float) -> Self:
+        """Returns the combined outcome of several batches.
+
+        Args:
+            reports (list[ExecutionReport]): The outcomes of the batches.
+            elapsed (float): The overall wall time in seconds.
+
+        Returns:
+            ExecutionReport: The combined outcome.
+        """
+        return cls(
+            [result for report in reports for result in report.results],
+            [failure for report in reports for failure in report.failures],
+            elapsed,
+        )
+
+    @property
+    def succeeded(self) -> int:
+        """Returns the number of successful mutations."""
+        return len(self.results) - len(self.failures)
+
+    @property
+    def throughput(self) -> float:
+        """Returns the successful mutations per second."""
+        return self.succeeded / self.elapsed if self.elapsed else 0.0
+
+    def get_summary(self) -> str:
+        """Returns a one-line summary of the batch.
+
+        Returns:
+            str: The summary.
+        """
+        return (
+            f"{self.succeeded} of {len(self.results)} changes applied in "
+            f"{self.elapsed:.1f}s ({self.throughput:.1f}/s)."
+        )
+
+
+@dataclass
+class MutationExecutor:
+    """This class is responsible for running batches of mutations."""
+
+    concurrency: int = 4
+    "The maximum number of in-flight mutations per rate-limit bucket."
+    retries: int = 2
+    "The number of retries of a mutation failing with a server error."
+    semaphores: dict[str, asyncio.Semaphore] = field(default_factory=dict)
+    "The concurrency limiter of each rate-limit bucket."
+    logger: logging.Logger = field(init=False)
+
+    def __post_init__(self) -> None:
+        """Acquires logger for the MutationExecutor."""
+        self.logger = logging.getLogger(__name__)
+
+    async def _attempt(self, mutation: Mutation) -> Any:  # noqa: ANN401
+        for attempt in range(self.retries):
+            try:
+                return await mutation.action()
+            except discord.DiscordServerError as e:
+                self.logger.warning(
+                    "Retrying %s after %s.",
+                    mutation.description,
+                    e.status,
+                )
+                await asyncio.sleep(2**attempt)
+        return await mutation.action()
+
+    async def _run_one(
+        self,
+        mutation: Mutation,
+        progress: ProgressReporter | None,
+    ) -> Any:  # noqa: ANN401
+        semaphore = self.semaphores.setdefault(
+            mutation.bucket,
+            asyncio.Semaphore(self.concurrency),
+        )
+        async with semaphore:
+            result = await self._attempt(mutation)
+
+        # The mutation has been applied by now, so a failure to report it
+        # must not count it as failed.
+        if not progress:
+            self.logger.info(mutation.description)
+            return result
+        try:
+            await progress.update(mutation.description)
+        except discord.HTTPException:
+            self.logger.exception("Failed to report: %s", mutation.description)
+        return result
+
+    async def run(
+        self,
+        mutations: Iterable[Mutation],
+        progress: ProgressReporter | None = None,
+    ) -> ExecutionReport:
+        """Runs the mutations with bounded concurrency per bucket.
+
+        Failed mutations are logged and reported rather than aborting the batch.
+
+        Args:
+            mutations (Iterable[Mutation]): The mutations to run.
+            progress (ProgressReporter | None): The reporter of completed mutations.
+
+        Returns:
+            ExecutionReport: The outcome of the batch.
+        """
+        mutations = list(mutations)
+        start = time.perf_counter()
+        outcomes = await asyncio.gather(
+            *(self._run_one(m, progress) for m in mutations),
+            return_exceptions=True,
+        )
+        elapsed = time.perf_counter() - start
+
+        results = []
+        failures = []
+        for mutation, outcome in zip(mutations, outcomes, strict=True):
+            if isinstance(outcome, discord.HTTPException):
+                self.logger.error("Failed: %s (%s)", mutation.description, outcome)
+                failures.append((mutation, outcome))
+                results.append(None)
+            elif isinstance(outcome, BaseException):
+                raise outcome
+            else:
+                results.append(outcome)
+
+        report = ExecutionReport(results, failures, elapsed)
+        self.logger.info("Executed mutations: %s", report.get_summary())
+        return report
+
+
+if __name__ == "__main__":
+    pass
@@ -0,0 +1,250 @@
+"""The histogram module is responsible for time-bucketed activity counts.
+
+Message counts are kept per channel and author in hourly buckets, keyed
+by username so an author's activity survives display name changes. Each
+series stores only the hours with activity, as two parallel arrays of
+hour indices and counts, so a quiet author costs a few bytes rather than
+a slot for every hour. Range totals and day, week or category rollups are
+computed over array slices found by bisection.
+"""
+
+import datetime as dt
+import logging
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from collections.abc import Iterable
+
+logger = logging.getLogger(__name__)
+
+Author = tuple[str, str]
+
+HistogramRow = tuple[int, str, str, bytes, bytes]
+
+
+def get_hour(when: dt.datetime) -> int:
+    """Returns the index of the hour containing the time.
+
+    Args:
+        when (dt.datetime): An aware time.
+
+    Returns:
+        int: The number of whole hours since the epoch.
+    """
+    return int(when.timestamp()) // 3600
+
+
+def get_time(hour: int) -> dt.datetime:
+    """Returns the start of the hour.
+
+    Args:
+        hour (int): The number of whole hours since the epoch.
+
+    Returns:
+        dt.datetime: The start of the hour in UTC.
+    """
+    return dt.datetime.fromtimestamp(hour * 3600, dt.UTC)
+
+
+class Series:
+    """The hourly message counts of an author in a channel."""
+
+    __slots__ = ("counts", "hours")
+
+    def __init__(self, hours: bytes = b"", counts: bytes = b"") -> None:
+        """Instantiates the series, optionally from saved arrays.
+
+        Args:
+            hours (bytes): The saved hour indices.
+            counts (bytes): The saved counts.
+        """
+        self.hours = array("I", hours)
+        "The sorted hours with activity."
+        self.counts = array("I", counts)
+        "The message count of each hour."
+
+    def add(self, hour: int, count: int = 1) -> None:
+        """Adds messages to an hour.
+
+        Args:
+            hour (int): The hour of the messages.
+            count (int): The number of messages.
+        """
+        hours = self.hours
+        if hours and hours[-1] == hour:
+            self.counts[-1] += count
+        elif not hours or hours[-1] < hour:
+            hours.append(hour)
+            self.counts.append(count)
+        else:
+            i = bisect_left(hours, hour)
+            if hours[i] == hour:
+                self.counts[i] += count
+            else:
+                hours.insert(i, hour)
+                self.counts.insert(i, count)
+
+    def _span(self, start: int, end: int) -> slice:
+        return slice(bisect_left(self.hours, start), bisect_left(self.hours, end))
+
+    def get_total(self, start: int, end: int) -> int:
+        """Returns the number of messages from the start hour until the end hour.
+
+        Args:
+            start (int): The first hour, inclusive.
+            end (int): The last hour, exclusive.
+
+        Returns:
+            int: The number of messages.
+        """
+        return sum(self.counts[self._span(start, end)])
+
+    def add_to_bins(self, bins: array, start: int, end: int, width: int) -> None:
+        """Adds the messages from the start hour until the end hour to bins.
+
+        Args:
+            bins (array): The totals of consecutive bins from the start hour.
+            start (int): The first hour, inclusive.
+            end (int): The last hour, exclusive.
+            width (int): The number of hours per bin.
+        """
+        span = self._span(start, end)
+        for hour, count in zip(self.hours[span], self.counts[span], strict=True):
+            bins[(hour - start) // width] += count
+
+
+class ActivityHistogram:
+    """The hourly message counts of every author in every channel."""
+
+    def __init__(self) -> None:
+        """Instantiates an empty histogram."""
+        self.series: dict[int, dict[str, Series]] = {}
+        "Mapping of channel ids to the series of each username."
+        self.names: dict[str, str] = {}
+        "Mapping of usernames to their latest display name."
+        self.dirty: set[tuple[int, str]] = set()
+        "The series changed since they were last saved."
+
+    def add(
+        self,
+        channel_id: int,
+        author: Author,
+        when: dt.datetime,
+        count: int = 1,
+    ) -> None:
+        """Adds messages of an author in a channel.
+
+        Args:
+            channel_id (int): The id of the channel.
+            author (Author): The (display name, username) of the author.
+            when (dt.datetime): The time of the messages.
+            count (int): The number of messages.
+        """
+        name, username = author
+        self.names[username] = name
+        channel = self.series.setdefault(channel_id, {})
+        if username not in channel:
+            channel[username] = Series()
+        channel[username].add(get_hour(when), count)
+        self.dirty.add((channel_id, username))
+
+    def _iter_series(
+        self,
+        channel_ids: Iterable[int],
+    ) -> Iterable[tuple[str, Series]]:
+        for channel_id in channel_ids:
+            yield from self.series.get(channel_id, {}).items()
+
+    def get_counts(
+        self,
+        channel_ids: Iterable[int],
+        start: dt.datetime,
+        end: dt.datetime,
+    ) -> Counter[Author]:
+        """Returns the message counts of each author across channels in a window.
+
+        Windows are resolved to whole hours.
+
+        Args:
+            channel_ids (Iterable[int]): The ids of the channels.
+            start (dt.datetime): The start of the window.
+            end (dt.datetime): The end of the window.
+
+        Returns:
+            Counter[Author]: Mapping of authors to message counts.
+        """
+        first, last = get_hour(start), get_hour(end) + 1
+        counts: Counter[Author] = Counter()
+        for username, series in self._iter_series(channel_ids):
+            if total := series.get_total(first, last):
+                counts[self.names[username], username] += total
+        return counts
+
+    def get_rollup(
+        self,
+        channel_ids: Iterable[int],
+        start: dt.datetime,
+        end: dt.datetime,
+        period: dt.timedelta,
+    ) -> list[tuple[dt.datetime, int]]:
+        """Returns the message totals across channels in consecutive periods.
+
+        Args:
+            channel_ids (Iterable[int]): The ids of the channels.
+            start (dt.datetime): The start of the first period.
+            end (dt.datetime): The end of the window.
+            period (dt.timedelta): The length of each period, in whole hours.
+
+        Returns:
+            list[tuple[dt.datetime, int]]: The start and total of each period,
+                or no periods for a reversed window.
+        """
+        first, last = get_hour(start), get_hour(end) + 1
+        if last <= first:
+            return []
+
+        width = max(1, int(period.total_seconds()) // 3600)
+        bins = array("Q", bytes(8 * -(-(last - first) // width)))
+        for _, series in self._iter_series(channel_ids):
+            series.add_to_bins(bins, first, last, width)
+        return [(get_time(first + i * width), total) for i, total in enumerate(bins)]
+
+    def load(self, rows: Iterable[HistogramRow]) -> None:
+        """Loads saved series.
+
+        Args:
+            rows (Iterable[HistogramRow]): The channel id, display name,
+                username, hours and counts of each saved series.
+        """
+        for channel_id, name, username, hours, counts in rows:
+            channel = self.series.setdefault(channel_id, {})
+            channel[username] = Series(hours, counts)
+            self.names.setdefault(username, name)
+        logger.info("Loaded activity histogram of %d channels.", len(self.series))
+
+    def pop_dirty(self) -> list[HistogramRow]:
+        """Returns the series changed since they were last saved, as rows.
+
+        Returns:
+            list[HistogramRow]: The channel id, display name, username, hours
+                and counts of each changed series.
+        """
+        rows = []
+        for channel_id, username in self.dirty:
+            series = self.series[channel_id][username]
+            name = self.names[username]
+            rows.append(
+                (
+                    channel_id,
+                    name,
+                    username,
+                    series.hours.tobytes(),
+                    series.counts.tobytes(),
+                ),
+            )
+        self.dirty.clear()
+        return rows
+
+
+if __name__ == "__main__":
+    pass
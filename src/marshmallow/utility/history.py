@@ -0,0 +1,208 @@
+"""The history module is responsible for scanning channel message history.
+
+Channels are scanned concurrently, with a bound on the number of history
+iterators in flight, and the per-author counts of every channel are merged
+into one report.
+
+Each channel's scan is checkpointed in the store as it goes, recording
+the range of its history that has been counted. A later scan whose window
+covers that range only fetches the messages before and after it, and a
+scan interrupted by a restart resumes where it stopped. A window that
+starts inside the range, or ends before it, is scanned in full, and the
+checkpoint is replaced by the window's unless the window ends before it.
+"""
+
+import asyncio
+import datetime as dt
+import logging
+import time
+from collections import Counter
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+
+import discord
+
+import marshmallow.utility.offload as ou
+import marshmallow.utility.store as st
+from marshmallow.utility.progress import ProgressReporter
+from marshmallow.utility.store import Checkpoint, Store
+
+Author = tuple[str, str]
+
+
+@dataclass
+class ScanReport:
+    """This represents the outcome of a history scan."""
+
+    counts: Counter[Author]
+    "Mapping of (display name, username) to message counts."
+    fetched: int
+    "The number of messages fetched from discord."
+    channels: int
+    "The number of channels scanned."
+    elapsed: float
+    "The wall time of the scan in seconds."
+    skipped: list[tuple[str, discord.HTTPException]] = field(default_factory=list)
+    "The names of the channels that failed to scan and their errors."
+
+    @property
+    def messages(self) -> int:
+        """Returns the number of messages scanned."""
+        return self.counts.total()
+
+    @property
+    def throughput(self) -> float:
+        """Returns the messages fetched per second."""
+        return self.fetched / self.elapsed if self.elapsed else 0.0
+
+    def get_summary(self) -> str:
+        """Returns a one-line summary of the scan.
+
+        Returns:
+            str: The summary.
+        """
+        summary = (
+            f"{self.messages} messages ({self.fetched} fetched) across "
+            f"{self.channels} channels in {self.elapsed:.1f}s "
+            f"({self.throughput:.1f}/s)."
+        )
+        if self.skipped:
+            names = ", ".join(name for name, _ in self.skipped)
+            summary += f" Skipped {len(self.skipped)} failed channels: {names}."
+        return summary
+
+
+@dataclass
+class HistoryScanner:
+    """This class is responsible for scanning the history of channels."""
+
+    concurrency: int = 4
+    "The maximum number of channels scanned at once."
+    checkpoint_every: int = 500
+    "The number of messages fetched between checkpoints."
+    store: Store = field(default_factory=st.get_store)
+    "The store the checkpoints are saved to."
+    logger: logging.Logger = field(init=False)
+
+    def __post_init__(self) -> None:
+        """Acquires logger for the HistoryScanner."""
+        self.logger = logging.getLogger(__name__)
+
+    async def _scan_one(
+        self,
+        channel: discord.TextChannel,
+        after: dt.datetime,
+        before: dt.datetime,
+        semaphore: asyncio.Semaphore,
+        progress: ProgressReporter | None,
+    ) -> tuple[Counter[Author], int]:
+        checkpoint = await ou.run_io(self.store.get_checkpoint, channel.id)
+        # A checkpoint is reused when the window covers its range, fetching
+        # only the messages before its start and after its position. One
+        # reaching past the end of the window counts too many messages, so
+        # the window is scanned in full and the checkpoint is kept.
+        persist = not checkpoint or checkpoint.through <= before
+        reuse = checkpoint and persist and after <= checkpoint.start
+        if checkpoint and reuse:
+            start = checkpoint.start
+            since = discord.Object(id=checkpoint.position)
+            counts = checkpoint.counts
+        else:
+            start = after
+            since = after
+            counts: Counter[Author] = Counter()
+
+        through = min(before, discord.utils.utcnow())
+        fetched = 0
+        async with semaphore:
+            if checkpoint and reuse and after < start:
+                # History after a time excludes ids up to its last snowflake.
+                head = discord.Object(
+                    id=discord.utils.time_snowflake(start, high=True) + 1
+                )
+                async for m in channel.history(limit=None, after=after, before=head):
+                    counts[m.author.display_name, m.author.name] += 1
+                    fetched += 1
+                start = after
+                extended = Checkpoint(
+                    start, checkpoint.position, checkpoint.through, counts
+                )
+                await ou.run_io(self.store.save_checkpoint, channel.id, extended)
+
+            async for m in channel.history(
+                limit=None,
+                after=since,
+                before=through,
+                oldest_first=True,
+            ):
+                counts[m.author.display_name, m.author.name] += 1
+                fetched += 1
+                if persist and fetched % self.checkpoint_every == 0:
+                    partial = Checkpoint(start, m.id, m.created_at, counts)
+                    await ou.run_io(self.store.save_checkpoint, channel.id, partial)
+
+        if persist:
+            # History before a time excludes ids from its snowflake onward.
+            position = discord.utils.time_snowflake(through) - 1
+            final = Checkpoint(start, position, through, counts)
+            await ou.run_io(self.store.save_checkpoint, channel.id, final)
+
+        resumed = " around checkpoint" if reuse else ""
+        event = f"Scanned {channel.name}: {fetched} messages fetched{resumed}."
+        if progress:
+            await progress.update(event)
+        else:
+            self.logger.info(event)
+        return counts, fetched
+
+    async def scan(
+        self,
+        channels: Iterable[discord.TextChannel],
+        after: dt.datetime,
+        before: dt.datetime,
+        progress: ProgressReporter | None = None,
+    ) -> ScanReport:
+        """Counts the messages of each author across the channels.
+
+        Channels that fail to scan, e.g. because the bot cannot read them,
+        are logged and reported rather than aborting the scan.
+
+        Args:
+            channels (Iterable[discord.TextChannel]): The channels to scan.
+            after (dt.datetime): The start of the window.
+            before (dt.datetime): The end of the window.
+            progress (ProgressReporter | None): The reporter of scanned channels.
+
+        Returns:
+            ScanReport: The merged counts of the scan.
+        """
+        channels = list(channels)
+        semaphore = asyncio.Semaphore(self.concurrency)
+        start = time.perf_counter()
+        scans = [
+            self._scan_one(ch, after, before, semaphore, progress) for ch in channels
+        ]
+        results = await asyncio.gather(*scans, return_exceptions=True)
+
+        counts: Counter[Author] = Counter()
+        fetched = 0
+        skipped = []
+        for channel, result in zip(channels, results, strict=True):
+            if isinstance(result, discord.HTTPException):
+                self.logger.error("Failed to scan %s (%s)", channel.name, result)
+                skipped.append((channel.name, result))
+            elif isinstance(result, BaseException):
+                raise result
+            else:
+                channel_counts, channel_fetched = result
+                counts.update(channel_counts)
+                fetched += channel_fetched
+
+        elapsed = time.perf_counter() - start
+        report = ScanReport(counts, fetched, len(channels), elapsed, skipped)
+        self.logger.info("Scanned history: %s", report.get_summary())
+        return report
+
+
+if __name__ == "__main__":
+    pass
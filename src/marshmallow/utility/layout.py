@@ -0,0 +1,446 @@
+"""The layout module is responsible for applying a declarative guild layout.
+
+A layout lists the roles, categories and channels a guild should have and
+the overwrites of each. It is compared against the live guild in a single
+pass over its roles and channels, producing a plan of only the missing or
+changed pieces, which can be printed as a dry run or applied in stages:
+roles, then categories, then channels, each stage concurrently.
+"""
+
+import logging
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from typing import Any
+
+import discord
+
+import marshmallow.utility.dchannels as dch
+from marshmallow.utility.executor import ExecutionReport, Mutation, MutationExecutor
+from marshmallow.utility.progress import ProgressReporter
+
+logger = logging.getLogger(__name__)
+
+Overwrites = dict[str, discord.PermissionOverwrite]
+
+ChannelKey = tuple[str | None, str, discord.ChannelType]
+
+KINDS = {
+    "text": discord.ChannelType.text,
+    "voice": discord.ChannelType.voice,
+}
+
+
+@dataclass(frozen=True)
+class RoleSpec:
+    """This represents a role of the layout."""
+
+    name: str
+    "The name of the role."
+    color: int | None = None
+    "The color of the role, or None to leave it unmanaged."
+    hoist: bool | None = None
+    "Whether the role is displayed separately, or None to leave it unmanaged."
+
+
+@dataclass
+class ChannelSpec:
+    """This represents a category or channel of the layout."""
+
+    name: str
+    "The name of the channel."
+    kind: discord.ChannelType
+    "The type of the channel."
+    category: str | None = None
+    "The name of the channel's category, if any."
+    overwrites: Overwrites = field(default_factory=dict)
+    "Mapping of role names to the channel's overwrite for the role."
+
+
+@dataclass
+class Layout:
+    """This represents a guild layout."""
+
+    roles: list[RoleSpec] = field(default_factory=list)
+    "The roles of the layout."
+    categories: list[ChannelSpec] = field(default_factory=list)
+    "The categories of the layout."
+    channels: list[ChannelSpec] = field(default_factory=list)
+    "The channels of the layout."
+
+
+def _get_access_overwrite(kind: discord.ChannelType) -> discord.PermissionOverwrite:
+    overwrite = dch.get_access_overwrite(kind)
+    if kind == discord.ChannelType.category:
+        # A category grants access to the text and voice channels it syncs to.
+        for channel_kind in (discord.ChannelType.text, discord.ChannelType.voice):
+            grants = dch.get_access_overwrite(channel_kind)
+            overwrite.update(**{name: value for name, value in grants if value})
+    return overwrite
+
+
+def _get_overwrite(
+    value: str | dict[str, bool],
+    kind: discord.ChannelType,
+) -> discord.PermissionOverwrite:
+    if value == "access":
+        return _get_access_overwrite(kind)
+    if value == "hidden":
+        return discord.PermissionOverwrite(view_channel=False)
+    return discord.PermissionOverwrite(**value)
+
+
+def _get_overwrites(
+    spec: dict[str, Any],
+    kind: discord.ChannelType,
+) -> Overwrites:
+    return {
+        name: _get_overwrite(value, kind)
+        for name, value in spec.get("overwrites", {}).items()
+    }
+
+
+def parse_layout(spec: dict[str, Any]) -> Layout:
+    """Returns the layout described by a layout specification.
+
+    Channels inherit the overwrites of their category, and each group
+    expands into a role and a channel only that role can access.
+
+    Args:
+        spec (dict[str, Any]): The layout specification, e.g. from layout.yml.
+
+    Returns:
+        Layout: The layout.
+    """
+    layout = Layout()
+    layout.roles = [
+        RoleSpec(r["name"], r.get("color"), r.get("hoist"))
+        for r in spec.get("roles", [])
+    ]
+
+    category_overwrites: dict[str, dict[str, Any]] = {}
+    for c in spec.get("categories", []):
+        kind = discord.ChannelType.category
+        layout.categories.append(
+            ChannelSpec(c["name"], kind, None, _get_overwrites(c, kind))
+        )
+        category_overwrites[c["name"]] = c.get("overwrites", {})
+        for ch in c.get("channels", []):
+            kind = KINDS[ch.get("type", "text")]
+            inherited = {
+                "overwrites": category_overwrites[c["name"]] | ch.get("overwrites", {})
+            }
+            layout.channels.append(
+                ChannelSpec(
+                    ch["name"], kind, c["name"], _get_overwrites(inherited, kind)
+                ),
+            )
+
+    for g in spec.get("groups", []):
+        kind = KINDS[g.get("type", "text")]
+        for i in range(*g["range"]):
+            role = g["role"].format(i=i)
+            overwrites = category_overwrites.get(g.get("category"), {}) | {
+                role: "access"
+            }
+            layout.roles.append(RoleSpec(role))
+            layout.channels.append(
+                ChannelSpec(
+                    g["channel"].format(i=i),
+                    kind,
+                    g.get("category"),
+                    _get_overwrites({"overwrites": overwrites}, kind),
+                ),
+            )
+
+    return layout
+
+
+@dataclass
+class Resolver:
+    """This class is responsible for resolving layout names to guild objects."""
+
+    roles: dict[str, discord.Role]
+    "Mapping of role names to roles."
+    categories: dict[str, discord.CategoryChannel]
+    "Mapping of category names to categories."
+
+    def add(self, obj: object) -> None:
+        """Records a created or edited role or category.
+
+        Args:
+            obj (object): The result of a layout mutation.
+        """
+        if isinstance(obj, discord.Role):
+            self.roles[obj.name] = obj
+        elif isinstance(obj, discord.CategoryChannel):
+            self.categories[obj.name] = obj
+
+    def get_overwrites(
+        self,
+        overwrites: Overwrites,
+    ) -> dict[discord.Role, discord.PermissionOverwrite]:
+        """Returns the overwrites keyed by role rather than role name.
+
+        Args:
+            overwrites (Overwrites): Mapping of role names to overwrites.
+
+        Returns:
+            dict[discord.Role, discord.PermissionOverwrite]: The overwrites of
+                every role that exists.
+        """
+        resolved = {}
+        for name, overwrite in overwrites.items():
+            if role := self.roles.get(name):
+                resolved[role] = overwrite
+            else:
+                logger.warning("Skipped overwrite of missing role '%s'.", name)
+        return resolved
+
+
+@dataclass
+class Change:
+    """This represents a single change of a layout plan."""
+
+    stage: int
+    "The stage of the change; roles, then categories, then channels."
+    description: str
+    "A description of the change for the plan."
+    build: Callable[[Resolver], Mutation]
+    "The builder of the change's mutation once its names are resolved."
+
+
+@dataclass
+class Plan:
+    """This represents the changes bringing a guild to a layout."""
+
+    changes: list[Change]
+    "The changes, one API call each."
+    resolver: Resolver
+    "The resolver of layout names to guild objects."
+
+    def get_lines(self) -> list[str]:
+        """Returns a description of each change.
+
+        Returns:
+            list[str]: The descriptions.
+        """
+        return [change.description for change in self.changes]
+
+    def get_estimate(self) -> int:
+        """Returns the estimated number of API calls to apply the plan.
+
+        Returns:
+            int: The number of API calls.
+        """
+        return len(self.changes)
+
+
+def _get_role_change(
+    guild: discord.Guild,
+    spec: RoleSpec,
+    role: discord.Role | None,
+) -> Change | None:
+    if not role:
+        return Change(
+            0,
+            f"+ role '{spec.name}'",
+            lambda _: Mutation(
+                bucket=f"create_role:{guild.id}",
+                description=f"Created role '{spec.name}'.",
+                action=lambda: guild.create_role(
+                    name=spec.name,
+                    color=discord.Color(spec.color or 0),
+                    hoist=bool(spec.hoist),
+                ),
+            ),
+        )
+
+    edits: dict[str, Any] = {}
+    if spec.color is not None and role.color.value != spec.color:
+        edits["color"] = discord.Color(spec.color)
+    if spec.hoist is not None and role.hoist != spec.hoist:
+        edits["hoist"] = spec.hoist
+    if not edits:
+        return None
+
+    return Change(
+        0,
+        f"~ role '{spec.name}' ({', '.join(edits)})",
+        lambda _: Mutation(
+            bucket=f"edit_role:{role.id}",
+            description=f"Updated role '{spec.name}'.",
+            action=lambda: role.edit(**edits),
+        ),
+    )
+
+
+def _create_channel(
+    guild: discord.Guild,
+    spec: ChannelSpec,
+    resolver: Resolver,
+) -> Mutation:
+    overwrites = resolver.get_overwrites(spec.overwrites)
+    if spec.kind == discord.ChannelType.category:
+        create = guild.create_category
+    elif spec.kind == discord.ChannelType.voice:
+        create = guild.create_voice_channel
+    else:
+        create = guild.create_text_channel
+
+    kwargs: dict[str, Any] = {"overwrites": overwrites}
+    if spec.category:
+        kwargs["category"] = resolver.categories.get(spec.category)
+    return Mutation(
+        bucket=f"create_channel:{guild.id}",
+        description=f"Created {spec.kind} '{spec.name}'.",
+        action=lambda: create(spec.name, **kwargs),
+    )
+
+
+def _edit_channel(
+    channel: discord.abc.GuildChannel,
+    spec: ChannelSpec,
+    resolver: Resolver,
+) -> Mutation:
+    # The layout's overwrites are merged into the channel's, so overwrites
+    # the layout does not name are kept rather than removed.
+    overwrites = channel.overwrites | resolver.get_overwrites(spec.overwrites)
+    return Mutation(
+        bucket=f"edit_channel:{channel.id}",
+        description=f"Updated {spec.kind} '{spec.name}' (overwrites).",
+        action=lambda: channel.edit(overwrites=overwrites),
+    )
+
+
+def _get_channel_change(
+    guild: discord.Guild,
+    spec: ChannelSpec,
+    channel: discord.abc.GuildChannel | None,
+    roles: dict[str, discord.Role],
+    planned: set[str],
+) -> Change | None:
+    stage = 1 if spec.kind == discord.ChannelType.category else 2
+    if not channel:
+        where = f" in '{spec.category}'" if spec.category else ""
+        return Change(
+            stage,
+            f"+ {spec.kind} '{spec.name}'{where}",
+            lambda resolver: _create_channel(guild, spec, resolver),
+        )
+
+    # A role created in stage 0 still needs its overwrite added, while a
+    # role that exists nowhere is skipped when the edit resolves it.
+    if all(
+        channel.overwrites_for(roles[name]) == overwrite
+        if name in roles
+        else name not in planned
+        for name, overwrite in spec.overwrites.items()
+    ):
+        return None
+
+    return Change(
+        stage,
+        f"~ {spec.kind} '{spec.name}' (overwrites)",
+        lambda resolver: _edit_channel(channel, spec, resolver),
+    )
+
+
+def _get_channel_key(channel: discord.abc.GuildChannel) -> ChannelKey:
+    category = channel.category.name if channel.category else None
+    return category, channel.name, channel.type
+
+
+def get_plan(
+    layout: Layout,
+    guild: discord.Guild,
+    roles: dict[str, discord.Role],
+) -> Plan:
+    """Returns the changes bringing the guild to the layout.
+
+    Roles of the layout that do not exist yet count as resolved, since they
+    are created before any channel. Overwrites are only added or updated:
+    overwrites on a channel that the layout does not name are kept.
+
+    Args:
+        layout (Layout): The layout.
+        guild (discord.Guild): The guild.
+        roles (dict[str, discord.Role]): Mapping of role names to guild roles.
+
+    Returns:
+        Plan: The plan.
+    """
+    categories: dict[str, discord.CategoryChannel] = {}
+    channels: dict[ChannelKey, discord.abc.GuildChannel] = {}
+    for ch in guild.channels:
+        if isinstance(ch, discord.CategoryChannel):
+            categories.setdefault(ch.name, ch)
+        else:
+            channels.setdefault(_get_channel_key(ch), ch)
+
+    planned = {spec.name for spec in layout.roles if spec.name not in roles}
+    changes = [
+        _get_role_change(guild, spec, roles.get(spec.name)) for spec in layout.roles
+    ]
+    changes += [
+        _get_channel_change(guild, spec, categories.get(spec.name), roles, planned)
+        for spec in layout.categories
+    ]
+    changes += [
+        _get_channel_change(
+            guild,
+            spec,
+            channels.get((spec.category, spec.name, spec.kind)),
+            roles,
+            planned,
+        )
+        for spec in layout.channels
+    ]
+
+    plan = Plan(
+        [change for change in changes if change],
+        Resolver(dict(roles), categories),
+    )
+    logger.info(
+        "Planned %d changes to %s for %d roles and %d channels.",
+        len(plan.changes),
+        guild.name,
+        len(layout.roles),
+        len(layout.categories) + len(layout.channels),
+    )
+    return plan
+
+
+async def apply_plan(
+    plan: Plan,
+    executor: MutationExecutor,
+    progress: ProgressReporter | None = None,
+) -> ExecutionReport:
+    """Applies the plan, each stage concurrently.
+
+    Args:
+        plan (Plan): The plan.
+        executor (MutationExecutor): The executor of the plan's mutations.
+        progress (ProgressReporter | None): The reporter of applied changes.
+
+    Returns:
+        ExecutionReport: The combined outcome of the stages.
+    """
+    start = time.perf_counter()
+    reports = []
+    for stage in range(3):
+        mutations = [
+            change.build(plan.resolver)
+            for change in plan.changes
+            if change.stage == stage
+        ]
+        report = await executor.run(mutations, progress)
+        for result in report.results:
+            plan.resolver.add(result)
+        reports.append(report)
+
+    return ExecutionReport.combine(reports, time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    pass
@@ -0,0 +1,142 @@
+"""This module is responsible for caching person to guild member matches.
+
+Matches are persisted under assignments/ so they survive bot restarts. An
+entry stays valid only while the person's aliases and the member's guild
+names are unchanged, so steady-state assignment runs skip name matching
+for everyone already found.
+"""
+
+import hashlib
+import json
+import logging
+from dataclasses import dataclass, field
+
+import discord
+
+from marshmallow.models import Information
+
+
+def get_person_key(info: Information) -> str:
+    """Returns the cache key identifying a person and their aliases.
+
+    Args:
+        info (Information): The person's information.
+
+    Returns:
+        str: The person's email and a digest of their aliases.
+    """
+    digest = hashlib.sha1("\0".join(info.aliases).encode(), usedforsecurity=False)
+    return f"{info.email}:{digest.hexdigest()}"
+
+
+def get_names_version(guild_names: list[str]) -> str:
+    """Returns a version stamp of a member's guild names.
+
+    Args:
+        guild_names (list[str]): The guild names of a member.
+
+    Returns:
+        str: A digest of the guild names.
+    """
+    digest = hashlib.sha1("\0".join(guild_names).encode(), usedforsecurity=False)
+    return digest.hexdigest()
+
+
+@dataclass
+class MatchCache:
+    """This class is responsible for persisting the matches of a guild."""
+
+    guild_id: int
+    "The id of the guild the matches belong to."
+    entries: dict[str, tuple[int, str]] = field(default_factory=dict)
+    "Mapping of person keys to member ids and guild names versions."
+    dirty: bool = False
+    "Whether the entries changed since they were last saved."
+    logger: logging.Logger = field(init=False)
+
+    def __post_init__(self) -> None:
+        """Acquires logger for the MatchCache and loads saved entries."""
+        self.logger = logging.getLogger(__name__)
+        self.load()
+
+    @property
+    def path(self) -> str:
+        """Returns the path of the cache file."""
+        return f"assignments/{self.guild_id}matches.json"
+
+    def load(self) -> None:
+        """Loads the saved entries, if any."""
+        try:
+            with open(self.path, encoding="UTF-8") as data:
+                self.entries = {k: tuple(v) for k, v in json.load(data).items()}
+        except FileNotFoundError:
+            self.logger.info("No saved matches for guild %d.", self.guild_id)
+            return
+        except json.JSONDecodeError:
+            self.logger.exception("Discarded corrupt matches for %d.", self.guild_id)
+            return
+
+        self.logger.info("Loaded %d saved matches.", len(self.entries))
+
+    def save(self) -> None:
+        """Saves the entries if they changed."""
+        if not self.dirty:
+            return
+
+        with open(self.path, "w", encoding="UTF-8") as data:
+            json.dump(self.entries, data)
+        self.dirty = False
+        self.logger.info("Saved %d matches.", len(self.entries))
+
+    def get(
+        self,
+        info: Information,
+        members_by_id: dict[int, discord.Member],
+        members_to_guild_names: dict[discord.Member, list[str]],
+    ) -> discord.Member | None:
+        """Returns the cached member of the person if the entry is still valid.
+
+        Args:
+            info (Information): The person's information.
+            members_by_id (dict): Mapping from member ids to guild members.
+            members_to_guild_names (dict): Mapping from guild members to guild names.
+
+        Returns:
+            discord.Member | None: The cached member or None.
+        """
+        entry = self.entries.get(get_person_key(info))
+        if not entry:
+            return None
+
+        member_id, version = entry
+        member = members_by_id.get(member_id)
+        if not member or get_names_version(members_to_guild_names[member]) != version:
+            return None
+        return member
+
+    def put(
+        self,
+        info: Information,
+        member: discord.Member | None,
+        guild_names: list[str],
+    ) -> None:
+        """Records the person's member, or forgets the person if None.
+
+        Args:
+            info (Information): The person's information.
+            member (discord.Member | None): The matched member or None.
+            guild_names (list[str]): The guild names of the member.
+        """
+        key = get_person_key(info)
+        if not member:
+            self.dirty |= self.entries.pop(key, None) is not None
+            return
+
+        entry = (member.id, get_names_version(guild_names))
+        if self.entries.get(key) != entry:
+            self.entries[key] = entry
+            self.dirty = True
+
+
+if __name__ == "__main__":
+    pass
@@ -0,0 +1,55 @@
+"""The offload module is responsible for running blocking I/O off the event loop.
+
+File and database work runs on a small dedicated thread pool, so command
+handlers await it instead of stalling the gateway heartbeat. Each call
+logs how long it would otherwise have blocked the event loop.
+"""
+
+import asyncio
+import functools
+import logging
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="marshmallow-io")
+
+
+def _timed(func: Callable[[], Any]) -> tuple[Any, float]:
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+async def run_io(func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:  # noqa: ANN401
+    """Runs the blocking function on the I/O thread pool.
+
+    Args:
+        func (Callable): The blocking function.
+        *args (Any): The positional arguments of the function.
+        **kwargs (Any): The keyword arguments of the function.
+
+    Returns:
+        Any: The result of the function.
+    """
+    call = functools.partial(func, *args, **kwargs)
+    loop = asyncio.get_running_loop()
+    result, elapsed = await loop.run_in_executor(_pool, _timed, call)
+    logger.info(
+        "Ran %s off the event loop (would have blocked for %.1f ms).",
+        func.__qualname__,
+        elapsed * 1000,
+    )
+    return result
+
+
+def shutdown() -> None:
+    """Waits for pending I/O and stops the thread pool."""
+    _pool.shutdown(wait=True)
+
+
+if __name__ == "__main__":
+    pass
@@ -0,0 +1,118 @@
+"""The overwrites module is responsible for coalescing permission overwrites.
+
+Setting an overwrite is a request per member or role and channel, so
+granting hundreds of members access to a channel costs hundreds of
+requests against the same channel's rate-limit bucket. A batch instead
+collects the pending overwrites of each channel and applies them in a
+single channel edit, merged with the overwrites already on the channel.
+"""
+
+import logging
+from dataclasses import dataclass, field
+
+import discord
+
+from marshmallow.utility.executor import Mutation
+
+Target = discord.Member | discord.Role
+
+NAMES_SHOWN = 3
+
+
+@dataclass
+class OverwriteBatch:
+    """This class is responsible for collecting overwrites per channel."""
+
+    pending: dict[
+        int,
+        tuple[discord.abc.GuildChannel, dict[Target, discord.PermissionOverwrite]],
+    ] = field(default_factory=dict)
+    "Mapping of channel ids to the channel and its pending overwrites."
+    requested: int = 0
+    "The number of overwrites requested."
+    logger: logging.Logger = field(init=False)
+
+    def __post_init__(self) -> None:
+        """Acquires logger for the OverwriteBatch."""
+        self.logger = logging.getLogger(__name__)
+
+    def add(
+        self,
+        channel: discord.abc.GuildChannel,
+        target: Target,
+        overwrite: discord.PermissionOverwrite,
+    ) -> None:
+        """Queues an overwrite, replacing any pending one for the target.
+
+        Args:
+            channel (discord.abc.GuildChannel): The channel to overwrite.
+            target (Target): The member or role to overwrite.
+            overwrite (discord.PermissionOverwrite): The overwrite.
+        """
+        _, overwrites = self.pending.setdefault(channel.id, (channel, {}))
+        overwrites[target] = overwrite
+        self.requested += 1
+
+    @property
+    def saved(self) -> int:
+        """Returns the number of requests saved by coalescing."""
+        return self.requested - len(self.pending)
+
+    def get_mutations(self) -> list[Mutation]:
+        """Returns a mutation per channel applying its pending overwrites.
+
+        The channel's overwrites are read when the mutation runs, so
+        overwrites set since the batch was collected are kept.
+
+        Returns:
+            list[Mutation]: The mutations.
+        """
+        mutations = [
+            _edit_overwrites(channel, overwrites)
+            for channel, overwrites in self.pending.values()
+        ]
+        self.logger.info(
+            "Coalesced %d overwrites into %d channel edits.",
+            self.requested,
+            len(mutations),
+        )
+        return mutations
+
+    def get_summary(self) -> str:
+        """Returns a one-line summary of the coalescing.
+
+        Returns:
+            str: The summary.
+        """
+        return (
+            f"Coalesced {self.requested} overwrites into {len(self.pending)} "
+            f"requests ({self.saved} saved)."
+        )
+
+
+async def _apply(
+    channel: discord.abc.GuildChannel,
+    overwrites: dict[Target, discord.PermissionOverwrite],
+) -> discord.abc.GuildChannel | None:
+    current = channel.overwrites
+    if all(current.get(t) == o for t, o in overwrites.items()):
+        return channel
+    return await channel.edit(overwrites=current | overwrites)
+
+
+def _edit_overwrites(
+    channel: discord.abc.GuildChannel,
+    overwrites: dict[Target, discord.PermissionOverwrite],
+) -> Mutation:
+    names = ", ".join(target.name for target in list(overwrites)[:NAMES_SHOWN])
+    if len(overwrites) > NAMES_SHOWN:
+        names += f" and {len(overwrites) - NAMES_SHOWN} more"
+    return Mutation(
+        bucket=f"edit_channel:{channel.id}",
+        description=f"Added {names} to {channel}.",
+        action=lambda: _apply(channel, overwrites),
+    )
+
+
+if __name__ == "__main__":
+    pass
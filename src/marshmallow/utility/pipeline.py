@@ -0,0 +1,64 @@
+"""The pipeline module is responsible for running staged, overlapping work.
+
+Each stage runs as its own task and hands chunks to the next stage
+through a bounded queue, so a slow stage applies backpressure instead of
+letting chunks pile up in memory, and later stages start on the first
+chunk while earlier stages are still producing the rest.
+"""
+
+import asyncio
+import logging
+from collections.abc import AsyncIterable, Awaitable, Callable
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+Stage = Callable[[Any], Awaitable[Any]]
+
+_DONE = object()
+
+
+async def _feed(source: AsyncIterable[Any], queue: asyncio.Queue) -> None:
+    async for chunk in source:
+        await queue.put(chunk)
+    await queue.put(_DONE)
+
+
+async def _work(stage: Stage, inbox: asyncio.Queue, outbox: asyncio.Queue) -> None:
+    while (chunk := await inbox.get()) is not _DONE:
+        await outbox.put(await stage(chunk))
+    await outbox.put(_DONE)
+
+
+async def run_pipeline(
+    source: AsyncIterable[Any],
+    *stages: Stage,
+    maxsize: int = 2,
+) -> int:
+    """Runs the chunks of the source through the stages concurrently.
+
+    Args:
+        source (AsyncIterable[Any]): The producer of chunks.
+        *stages (Stage): The stages each chunk passes through, in order.
+        maxsize (int): The maximum number of chunks waiting between stages.
+
+    Returns:
+        int: The number of chunks that passed through every stage.
+    """
+    queues = [asyncio.Queue(maxsize) for _ in range(len(stages) + 1)]
+
+    async with asyncio.TaskGroup() as tg:
+        tg.create_task(_feed(source, queues[0]))
+        for stage, inbox, outbox in zip(stages, queues, queues[1:], strict=False):
+            tg.create_task(_work(stage, inbox, outbox))
+
+        chunks = 0
+        while await queues[-1].get() is not _DONE:
+            chunks += 1
+
+    logger.info("Pipeline processed %d chunks through %d stages.", chunks, len(stages))
+    return chunks
+
+
+if __name__ == "__main__":
+    pass
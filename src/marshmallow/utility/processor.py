@@ -1,33 +1,19 @@
 """The processor module is responsible for processing server information."""
 
 import logging
-from collections.abc import Sequence
+from collections import deque
+from collections.abc import Iterable, Sequence
+from enum import IntEnum, unique
 
 import discord
 
-from marshmallow.models import GuildPerson
+import marshmallow.utility.fuzzy as fz
+from marshmallow.models import Cohort, GuildPerson
+from marshmallow.utility.matchcache import MatchCache
 
 logger = logging.getLogger("assign")
 
 
-def is_name_match(guild_names: list[str], aliases: list[str]) -> bool:
-    """Returns whether there is a match between an alias and guild name.
-
-    Args:
-        guild_names (list[str]): Guild names of an individual (from discord).
-        aliases (list[str]): Names of an individual (from spreadsheet).
-
-    Returns:
-        bool: Whether a match has occurred.
-    """
-    for alias in aliases:
-        for guild_name in guild_names:
-            if alias in guild_name:
-                return True
-
-    return False
-
-
 def _get_guild_member_names(member: discord.Member) -> list[str]:
     """Return all names associated with guild member.
 
@@ -50,7 +36,7 @@ def _get_guild_member_names(member: discord.Member) -> list[str]:
         names.add(nick)
         names.add(nick.replace(" ", ""))
 
-    return list(names)
+    return sorted(names)
 
 
 def get_member_guild_name_map(
@@ -67,21 +53,531 @@ def get_member_guild_name_map(
     return {member: _get_guild_member_names(member) for member in members}
 
 
-def get_assignment_counts(people: list[GuildPerson]) -> tuple[int, int]:
-    """Returns the assignment counts.
+class MemberNameIndex:
+    """A long-lived index of a guild's members and their guild names.
+
+    The index is built once when the guild becomes available and is kept
+    current from member and user events, so matching reads a ready mapping
+    instead of rescanning the member list.
+    """
+
+    def __init__(self, members: Iterable[discord.Member]) -> None:
+        """Builds the index over the members.
+
+        Args:
+            members (Iterable[discord.Member]): The guild members.
+        """
+        self.members_to_guild_names: dict[discord.Member, list[str]] = {
+            member: _get_guild_member_names(member) for member in members
+        }
+        "Mapping of members to associated guild names."
+        self.version: int = 0
+        "The number of changes applied to the index."
+
+    def update(self, member: discord.Member) -> None:
+        """Adds the member to the index or refreshes their guild names.
+
+        Args:
+            member (discord.Member): The joined or updated guild member.
+        """
+        names = _get_guild_member_names(member)
+        if self.members_to_guild_names.get(member) == names:
+            return
+
+        self.members_to_guild_names.pop(member, None)
+        self.members_to_guild_names[member] = names
+        self.version += 1
+
+    def remove(self, member: discord.Member) -> None:
+        """Removes the member from the index.
+
+        Args:
+            member (discord.Member): The departed guild member.
+        """
+        if self.members_to_guild_names.pop(member, None) is not None:
+            self.version += 1
+
+
+class AliasAutomaton:
+    """An Aho-Corasick automaton over the aliases of a cohort.
+
+    The automaton is built once over every alias of every person, so each
+    guild name only needs to be streamed through it a single time to find
+    all people with an alias contained in that name, in one linear pass.
+    """
+
+    def __init__(self, people: Sequence[GuildPerson]) -> None:
+        """Builds the automaton over the aliases of the people.
+
+        Args:
+            people (Sequence[GuildPerson]): The people to match.
+        """
+        self._goto: list[dict[str, int]] = [{}]
+        "The trie transitions of each state."
+        self._fail: list[int] = [0]
+        "The failure link of each state."
+        self._out: list[set[int]] = [set()]
+        "The indices of the people whose alias ends at each state."
+
+        for i, person in enumerate(people):
+            for alias in person.info.aliases:
+                # An empty alias would end at the root and hit every name.
+                if alias:
+                    self._insert(alias, i)
+        self._link()
+
+    def _insert(self, alias: str, person: int) -> None:
+        state = 0
+        for char in alias:
+            nxt = self._goto[state].get(char)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][char] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(set())
+            state = nxt
+        self._out[state].add(person)
+
+    def _link(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                link = self._goto[fail].get(char, 0)
+                self._fail[nxt] = link if link != nxt else 0
+                self._out[nxt] |= self._out[self._fail[nxt]]
+
+    def search(self, text: str) -> set[int]:
+        """Returns the people with an alias contained in the text.
+
+        Args:
+            text (str): The text to scan, e.g. a guild name.
+
+        Returns:
+            set[int]: The indices of the matching people.
+        """
+        found = set(self._out[0])
+        state = 0
+        for char in text:
+            while state and char not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(char, 0)
+            found |= self._out[state]
+
+        return found
+
+    def get_matches(
+        self,
+        members_to_guild_names: dict[discord.Member, list[str]],
+    ) -> dict[int, list[discord.Member]]:
+        """Returns every person to member hit in a single pass over the members.
+
+        Args:
+            members_to_guild_names (dict): Mapping from guild members to guild names.
+
+        Returns:
+            dict[int, list[discord.Member]]: Mapping of person indices to the
+                members they match, in the iteration order of the mapping.
+        """
+        matches: dict[int, list[discord.Member]] = {}
+        for member, guild_names in members_to_guild_names.items():
+            hits: set[int] = set()
+            for guild_name in guild_names:
+                hits |= self.search(guild_name)
+            for person in hits:
+                matches.setdefault(person, []).append(member)
+
+        return matches
+
+
+@unique
+class MatchScore(IntEnum):
+    """The strength of a match between an alias and a guild member."""
+
+    NONE = 0
+    USERNAME_SUBSTRING = 1
+    GLOBAL_NAME_SUBSTRING = 2
+    NICKNAME_SUBSTRING = 3
+    GLOBAL_NAME = 4
+    NICKNAME = 5
+    USERNAME = 6
+
+
+def _get_match_score(member: discord.Member, alias: str) -> MatchScore:
+    """Returns the strength of the match between the member and the alias.
 
     Args:
-        people (list[GuildPerson]): The people assigned roles.
+        member (discord.Member): The guild member.
+        alias (str): A name of an individual (from spreadsheet).
 
     Returns:
-        tuple[int, int]: The found and not found counts of people.
+        MatchScore: The strength of the match.
+    """
+    if not alias:
+        return MatchScore.NONE
+
+    username = member.name.strip().lower()
+    global_names = _get_name_variants(member.global_name)
+    nicknames = _get_name_variants(member.nick)
+
+    checks = (
+        (MatchScore.USERNAME, alias == username),
+        (MatchScore.NICKNAME, alias in nicknames),
+        (MatchScore.GLOBAL_NAME, alias in global_names),
+        (MatchScore.NICKNAME_SUBSTRING, any(alias in n for n in nicknames)),
+        (MatchScore.GLOBAL_NAME_SUBSTRING, any(alias in n for n in global_names)),
+        (MatchScore.USERNAME_SUBSTRING, alias in username),
+    )
+    return next((score for score, hit in checks if hit), MatchScore.NONE)
+
+
+def _get_name_variants(name: str | None) -> tuple[str, ...]:
+    if not name:
+        return ()
+    name = name.strip().lower()
+    return (name, name.replace(" ", ""))
+
+
+def _claim_candidates(
+    people: Sequence[GuildPerson],
+    candidates: list[tuple[float, int, int, discord.Member]],
+    matched: set[int],
+    claimed: set[int],
+) -> int:
+    """Claims candidate pairs greedily from the strongest score down.
+
+    Args:
+        people (Sequence[GuildPerson]): The people to match.
+        candidates (list): The negated score, person index, member id and member
+            of each candidate pair.
+        matched (set[int]): The indices of the people already matched.
+        claimed (set[int]): The ids of the members already claimed.
+
+    Returns:
+        int: The number of pairs lost to a conflict.
     """
-    found = 0
+    candidates.sort(key=lambda c: c[:3])
+
+    conflicts = 0
+    for _, i, member_id, member in candidates:
+        if i in matched:
+            continue
+        if member_id in claimed:
+            conflicts += 1
+            continue
+        people[i].guild_member = member
+        matched.add(i)
+        claimed.add(member_id)
+
+    return conflicts
+
+
+def set_guild_members(
+    people: Sequence[GuildPerson],
+    members_to_guild_names: dict[discord.Member, list[str]],
+    *,
+    fuzzy: bool = False,
+    cache: MatchCache | None = None,
+) -> None:
+    """Sets the guild members of the people with a global one-to-one matching.
+
+    Candidate pairs come from a single automaton pass, so only pairs sharing
+    a substring hit are ever scored. Pairs are then claimed greedily from the
+    strongest score down, breaking ties by cohort order and member id, so no
+    two people are matched to the same member and the result does not depend
+    on the iteration order of the mapping.
+
+    In fuzzy mode, people left unmatched are then compared against the
+    unclaimed members by trigram similarity and claimed the same way.
+
+    Given a cache, people whose cached match is still valid are set without
+    matching, and the cache is updated with the results.
+
+    Args:
+        people (Sequence[GuildPerson]): The people to match.
+        members_to_guild_names (dict): Mapping from guild members to guild names.
+        fuzzy (bool): Whether to fuzzy match the people left unmatched.
+        cache (MatchCache | None): The persistent match cache.
+    """
+    matched: set[int] = set()
+    claimed: set[int] = set()
+    if cache:
+        _set_cached_guild_members(
+            people,
+            members_to_guild_names,
+            cache,
+            matched,
+            claimed,
+        )
+
+    pending = [i for i in range(len(people)) if i not in matched]
+    unclaimed = {
+        member: guild_names
+        for member, guild_names in members_to_guild_names.items()
+        if member.id not in claimed
+    }
+    matches = AliasAutomaton([people[i] for i in pending]).get_matches(unclaimed)
+
+    candidates = []
+    for j, members in matches.items():
+        aliases = people[pending[j]].info.aliases
+        for member in members:
+            score = max(_get_match_score(member, alias) for alias in aliases)
+            if score:
+                candidates.append((-score, pending[j], member.id, member))
+
+    found = len(matched)
+    conflicts = _claim_candidates(people, candidates, matched, claimed)
+    logger.info(
+        "Matched %d of %d people from %d candidate pairs (%d conflicts).",
+        len(matched) - found,
+        len(pending),
+        len(candidates),
+        conflicts,
+    )
+
+    if fuzzy:
+        _set_fuzzy_guild_members(people, members_to_guild_names, matched, claimed)
+
+    if cache:
+        for person in people:
+            member = person.guild_member
+            cache.put(
+                person.info,
+                member,
+                members_to_guild_names[member] if member else [],
+            )
+
+
+class StreamingMatcher:
+    """Settles the matches of people while the rest of the cohort is read.
+
+    A valid cached match, or an alias equal to a member's username, is the
+    strongest match a person can have, so it is claimed as soon as the
+    person's chunk arrives. Members a later row might still claim first,
+    through its own cached match or a deferred earlier row, are left to
+    set_guild_members over the people who remain, so the result is the
+    same as matching the whole cohort at once.
+    """
+
+    def __init__(
+        self,
+        members_to_guild_names: dict[discord.Member, list[str]],
+        cache: MatchCache | None = None,
+    ) -> None:
+        """Prepares the lookups over the members.
+
+        Args:
+            members_to_guild_names (dict): Mapping from guild members to guild names.
+            cache (MatchCache | None): The persistent match cache.
+        """
+        self.members_to_guild_names = members_to_guild_names
+        "Mapping of members to associated guild names."
+        self.cache = cache
+        "The persistent match cache."
+        self.claimed: set[int] = set()
+        "The ids of the members already claimed."
+        self._members_by_id = {member.id: member for member in members_to_guild_names}
+        "Mapping of member ids to guild members."
+        self._members_by_username = {
+            member.name.strip().lower(): member for member in members_to_guild_names
+        }
+        "Mapping of usernames to guild members."
+        self._contested: set[int] = (
+            {member_id for member_id, _ in cache.entries.values()} if cache else set()
+        )
+        "The ids of the members a later row might claim first."
+
+    def _settle(self, person: GuildPerson) -> discord.Member | None:
+        if self.cache:
+            member = self.cache.get(
+                person.info,
+                self._members_by_id,
+                self.members_to_guild_names,
+            )
+            if member and member.id not in self.claimed:
+                return member
+
+        hits = sorted(
+            {
+                member.id: member
+                for alias in person.info.aliases
+                if (member := self._members_by_username.get(alias))
+            }.items(),
+        )
+        for member_id, member in hits:
+            if member_id in self.claimed:
+                continue
+            if member_id in self._contested:
+                break
+            return member
+
+        # A deferred person may still claim any of their username hits, so
+        # no later row can settle on them.
+        self._contested.update(member_id for member_id, _ in hits)
+        return None
+
+    def settle(self, chunk: Sequence[GuildPerson]) -> list[GuildPerson]:
+        """Sets the guild members of the people in the chunk whose match is settled.
+
+        Args:
+            chunk (Sequence[GuildPerson]): The next people of the cohort.
+
+        Returns:
+            list[GuildPerson]: The people of the chunk that were matched.
+        """
+        settled = []
+        for person in chunk:
+            member = self._settle(person)
+            if not member:
+                continue
+            person.guild_member = member
+            self.claimed.add(member.id)
+            settled.append(person)
+            if self.cache:
+                self.cache.put(
+                    person.info,
+                    member,
+                    self.members_to_guild_names[member],
+                )
+
+        logger.info("Settled %d of %d people.", len(settled), len(chunk))
+        return settled
+
+    def get_unclaimed(self) -> dict[discord.Member, list[str]]:
+        """Returns the members not yet claimed and their guild names.
+
+        Returns:
+            dict: Mapping from unclaimed guild members to guild names.
+        """
+        return {
+            member: guild_names
+            for member, guild_names in self.members_to_guild_names.items()
+            if member.id not in self.claimed
+        }
+
+
+def _set_cached_guild_members(
+    people: Sequence[GuildPerson],
+    members_to_guild_names: dict[discord.Member, list[str]],
+    cache: MatchCache,
+    matched: set[int],
+    claimed: set[int],
+) -> None:
+    """Sets the guild members of the people with a valid cached match.
+
+    Args:
+        people (Sequence[GuildPerson]): The people to match.
+        members_to_guild_names (dict): Mapping from guild members to guild names.
+        cache (MatchCache): The persistent match cache.
+        matched (set[int]): The indices of the people already matched.
+        claimed (set[int]): The ids of the members already claimed.
+    """
+    members_by_id = {member.id: member for member in members_to_guild_names}
+    for i, person in enumerate(people):
+        member = cache.get(person.info, members_by_id, members_to_guild_names)
+        if member and member.id not in claimed:
+            person.guild_member = member
+            matched.add(i)
+            claimed.add(member.id)
+
+    logger.info("Reused %d of %d cached matches.", len(matched), len(people))
+
+
+def _set_fuzzy_guild_members(
+    people: Sequence[GuildPerson],
+    members_to_guild_names: dict[discord.Member, list[str]],
+    matched: set[int],
+    claimed: set[int],
+) -> None:
+    """Sets the guild members of unmatched people by trigram similarity.
+
+    Args:
+        people (Sequence[GuildPerson]): The people to match.
+        members_to_guild_names (dict): Mapping from guild members to guild names.
+        matched (set[int]): The indices of the people already matched.
+        claimed (set[int]): The ids of the members already claimed.
+    """
+    unmatched = [i for i in range(len(people)) if i not in matched]
+    index = fz.TrigramIndex(
+        {
+            member: guild_names
+            for member, guild_names in members_to_guild_names.items()
+            if member.id not in claimed
+        },
+    )
+    batch = index.get_batch_candidates([people[i].info.aliases for i in unmatched])
+
+    candidates = [
+        (-score, i, member.id, member)
+        for i, top in zip(unmatched, batch, strict=True)
+        for member, score in top
+    ]
+    found = len(matched)
+    conflicts = _claim_candidates(people, candidates, matched, claimed)
+    logger.info(
+        "Fuzzy matched %d of %d unmatched people (%d conflicts).",
+        len(matched) - found,
+        len(unmatched),
+        conflicts,
+    )
+
+
+def get_role_deltas(
+    people: Sequence[GuildPerson],
+) -> list[tuple[discord.Member, list[discord.Role]]]:
+    """Returns the designated roles each matched member is still missing.
+
+    Desired and actual role state are compared for the whole cohort in one
+    pass, so only members with a non-empty delta need to be touched.
+
+    Args:
+        people (Sequence[GuildPerson]): The people assigned roles.
+
+    Returns:
+        list[tuple[discord.Member, list[discord.Role]]]: The members and their
+            missing roles.
+    """
+    deltas = []
+    matched = 0
     for person in people:
-        if person.guild_member:
-            found += 1
+        member = person.guild_member
+        if not member:
+            continue
+        matched += 1
+
+        missing = [
+            role
+            for role in dict.fromkeys(person.guild_roles)
+            if role and not member.get_role(role.id)
+        ]
+        if missing:
+            deltas.append((member, missing))
+
+    logger.info(
+        "Role delta: %d roles across %d of %d matched people.",
+        sum(len(roles) for _, roles in deltas),
+        len(deltas),
+        matched,
+    )
+    return deltas
+
 
-    return found, len(people) - found
+def get_assignment_counts(cohort: Cohort) -> tuple[int, int]:
+    """Returns the assignment counts.
+
+    Args:
+        cohort (Cohort): The people assigned roles.
+
+    Returns:
+        tuple[int, int]: The found and not found counts of people.
+    """
+    return cohort.get_counts()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,94 @@
+"""The progress module is responsible for reporting progress of long commands.
+
+Rather than sending a channel message per event, a progress reporter
+logs every event, buffers them, and edits a single status message in
+place at a bounded rate before posting one final summary.
+"""
+
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from types import TracebackType
+from typing import Self
+
+import discord
+from discord.ext import commands
+
+
+@dataclass
+class ProgressReporter:
+    """This class is responsible for reporting the progress of a command."""
+
+    ctx: commands.Context
+    "The command context to report to."
+    logger: logging.Logger
+    "The logger by which to log every event."
+    title: str
+    "The title of the status message."
+    interval: float = 2.0
+    "The minimum number of seconds between status message edits."
+    recent: deque[str] = field(default_factory=lambda: deque(maxlen=5))
+    "The most recent events."
+    count: int = 0
+    "The number of events reported."
+    message: discord.Message | None = None
+    "The status message."
+    last_edit: float = 0.0
+    "The time of the last status message edit."
+    finished: bool = False
+    "Whether the final summary was posted."
+
+    async def __aenter__(self) -> Self:
+        """Sends the status message."""
+        self.logger.info(self.title)
+        self.message = await self.ctx.send(f"*{self.title}...*")
+        self.last_edit = time.monotonic()
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        """Posts the final summary if the command did not."""
+        if exc_type:
+            await self.finish(f"Interrupted after {self.count} events.")
+        elif not self.finished:
+            await self.finish(f"Finished {self.count} events.")
+
+    def _render(self, status: str) -> str:
+        lines = [f"*{self.title}* ({status})", *self.recent]
+        return "\n".join(lines)
+
+    async def update(self, event: str) -> None:
+        """Logs the event and refreshes the status message if due.
+
+        Args:
+            event (str): The event to report.
+        """
+        self.logger.info(event)
+        self.count += 1
+        self.recent.append(event)
+
+        now = time.monotonic()
+        if not self.message or now - self.last_edit < self.interval:
+            return
+        self.last_edit = now
+        await self.message.edit(content=self._render(f"{self.count} done"))
+
+    async def finish(self, summary: str) -> None:
+        """Posts the final summary to the status message.
+
+        Args:
+            summary (str): The summary of the command.
+        """
+        self.logger.info("%s: %s", self.title, summary)
+        self.finished = True
+        if self.message:
+            await self.message.edit(content=self._render(summary))
+
+
+if __name__ == "__main__":
+    pass
@@ -0,0 +1,168 @@
+"""The provisioning module is responsible for creating channels and roles in bulk.
+
+Names are resolved against the guild's prebuilt channel and role indexes
+up front, so only the missing objects are created, concurrently through
+the mutation executor, and access is granted only where a channel's
+overwrite for a role differs. Re-running a provisioning command is
+therefore safe and cheap.
+"""
+
+import asyncio
+import logging
+import time
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+
+import discord
+
+import marshmallow.utility.dchannels as dch
+import marshmallow.utility.executor as ex
+from marshmallow.utility.dmaps import ChannelIndex, RoleIndex
+from marshmallow.utility.executor import ExecutionReport, MutationExecutor
+from marshmallow.utility.progress import ProgressReporter
+
+Channel = discord.TextChannel | discord.VoiceChannel
+
+
+@dataclass
+class Provisioner:
+    """This class is responsible for idempotently provisioning groups."""
+
+    executor: MutationExecutor
+    "The executor of the provisioning mutations."
+    logger: logging.Logger = field(init=False)
+
+    def __post_init__(self) -> None:
+        """Acquires logger for the Provisioner."""
+        self.logger = logging.getLogger(__name__)
+
+    async def provision_channels(
+        self,
+        index: ChannelIndex,
+        template: Channel,
+        names: Sequence[str],
+        progress: ProgressReporter | None = None,
+    ) -> tuple[dict[str, Channel], ExecutionReport]:
+        """Clones the template into every named channel that does not exist.
+
+        Args:
+            index (ChannelIndex): The guild's channel name index.
+            template (Channel): The channel to clone from.
+            names (Sequence[str]): The names of the channels.
+            progress (ProgressReporter | None): The reporter of created channels.
+
+        Returns:
+            tuple[dict[str, Channel], ExecutionReport]: The channel of each
+                name, existing or created, and the outcome of the creations.
+        """
+        channels = {name: index.get(name) for name in names}
+        missing = [name for name, channel in channels.items() if not channel]
+        self.logger.info(
+            "Provisioning %d of %d channels.",
+            len(missing),
+            len(channels),
+        )
+
+        report = await self.executor.run(
+            [ex.clone(template, name) for name in missing],
+            progress,
+        )
+        channels.update(zip(missing, report.results, strict=True))
+        return channels, report
+
+    async def provision_roles(
+        self,
+        index: RoleIndex,
+        guild: discord.Guild,
+        template: discord.Role,
+        names: Sequence[str],
+        progress: ProgressReporter | None = None,
+    ) -> tuple[dict[str, discord.Role], ExecutionReport]:
+        """Clones the template into every named role that does not exist.
+
+        Args:
+            index (RoleIndex): The guild's role name index.
+            guild (discord.Guild): The guild to create the roles in.
+            template (discord.Role): The role to clone from.
+            names (Sequence[str]): The names of the roles.
+            progress (ProgressReporter | None): The reporter of created roles.
+
+        Returns:
+            tuple[dict[str, discord.Role], ExecutionReport]: The role of each
+                name, existing or created, and the outcome of the creations.
+        """
+        roles = {name: index.get(name) for name in names}
+        missing = [name for name, role in roles.items() if not role]
+        self.logger.info("Provisioning %d of %d roles.", len(missing), len(roles))
+
+        report = await self.executor.run(
+            [ex.create_role(guild, template, name) for name in missing],
+            progress,
+        )
+        roles.update(zip(missing, report.results, strict=True))
+        return roles, report
+
+    async def provision_groups(  # noqa: PLR0917
+        self,
+        channel_index: ChannelIndex,
+        role_index: RoleIndex,
+        channel: Channel,
+        role: discord.Role,
+        groups: Sequence[tuple[str, str]],
+        progress: ProgressReporter | None = None,
+    ) -> ExecutionReport:
+        """Provisions a channel and role per group, granting the role access.
+
+        Args:
+            channel_index (ChannelIndex): The guild's channel name index.
+            role_index (RoleIndex): The guild's role name index.
+            channel (Channel): The channel to clone from.
+            role (discord.Role): The role to clone from.
+            groups (Sequence[tuple[str, str]]): The channel and role name of
+                each group.
+            progress (ProgressReporter | None): The reporter of changes.
+
+        Returns:
+            ExecutionReport: The combined outcome of the provisioning.
+        """
+        start = time.perf_counter()
+        (channels, channel_report), (roles, role_report) = await asyncio.gather(
+            self.provision_channels(
+                channel_index,
+                channel,
+                [c for c, _ in groups],
+                progress,
+            ),
+            self.provision_roles(
+                role_index,
+                channel.guild,
+                role,
+                [r for _, r in groups],
+                progress,
+            ),
+        )
+
+        grants = []
+        for channel_name, role_name in groups:
+            ch, r = channels[channel_name], roles[role_name]
+            if not ch or not r:
+                self.logger.warning(
+                    "Skipped granting '%s' access to '%s'.",
+                    role_name,
+                    channel_name,
+                )
+                continue
+
+            overwrite = dch.get_basic_access_overwrite(ch)
+            if ch.overwrites_for(r) != overwrite:
+                grants.append(ex.set_permissions(ch, r, overwrite))
+
+        grant_report = await self.executor.run(grants, progress)
+        return ExecutionReport.combine(
+            [channel_report, role_report, grant_report],
+            time.perf_counter() - start,
+        )
+
+
+if __name__ == "__main__":
+    pass
@@ -0,0 +1,489 @@
+"""The store module is responsible for persisting reports in SQLite.
+
+Assignment reports and message counts live in a single database under
+data/ in WAL mode, so readers never block the writer. Reports are written
+as transactional batch upserts, and the report commands read them back
+through indexed queries instead of re-parsing whole files.
+"""
+
+import csv
+import datetime as dt
+import functools
+import json
+import logging
+import os
+import sqlite3
+import threading
+from array import array
+from collections import Counter
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass, field
+
+HISTOGRAMS_TABLE = """
+CREATE TABLE IF NOT EXISTS histograms (
+    channel_id INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    username TEXT NOT NULL,
+    hours BLOB NOT NULL,
+    counts BLOB NOT NULL,
+    PRIMARY KEY (channel_id, username)
+);
+"""
+
+CHECKPOINTS_TABLE = """
+CREATE TABLE IF NOT EXISTS checkpoints (
+    channel_id INTEGER PRIMARY KEY,
+    start TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    through TEXT NOT NULL
+);
+"""
+
+CHECKPOINT_COUNTS_TABLE = """
+CREATE TABLE IF NOT EXISTS checkpoint_counts (
+    channel_id INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    username TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (channel_id, name, username)
+);
+"""
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS assignments (
+    grp TEXT NOT NULL,
+    email TEXT NOT NULL,
+    full_name TEXT NOT NULL,
+    display_name TEXT,
+    username TEXT,
+    role_names TEXT NOT NULL,
+    found INTEGER NOT NULL,
+    aliases TEXT NOT NULL,
+    PRIMARY KEY (grp, email)
+);
+CREATE INDEX IF NOT EXISTS assignments_email ON assignments (email);
+CREATE INDEX IF NOT EXISTS assignments_username ON assignments (username);
+CREATE INDEX IF NOT EXISTS assignments_found ON assignments (grp, found);
+
+CREATE TABLE IF NOT EXISTS messages (
+    report TEXT NOT NULL,
+    username TEXT NOT NULL,
+    name TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (report, username)
+);
+CREATE INDEX IF NOT EXISTS messages_username ON messages (username);
+CREATE INDEX IF NOT EXISTS messages_count ON messages (report, count DESC);
+
+CREATE TABLE IF NOT EXISTS settings (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+ASSIGNMENT_COLUMNS = (
+    "full_name",
+    "display_name",
+    "username",
+    "role_names",
+    "email",
+    "found",
+    "aliases",
+)
+
+MESSAGE_COLUMNS = ("name", "username", "count")
+
+
+@dataclass
+class Checkpoint:
+    """This represents the range of a channel's history that has been counted."""
+
+    start: dt.datetime
+    "The time from which every message is counted."
+    position: int
+    "The snowflake after which counting resumes."
+    through: dt.datetime
+    "The time up to which every message is counted."
+    counts: Counter[tuple[str, str]]
+    "Mapping of (display name, username) to message counts so far."
+
+
+@dataclass
+class Store:
+    """This class is responsible for reading and writing the bot's database."""
+
+    path: str = "data/marshmallow.db"
+    "The path of the database file."
+    connection: sqlite3.Connection = field(init=False)
+    "The connection to the database."
+    lock: threading.Lock = field(default_factory=threading.Lock)
+    "The lock serializing use of the connection across threads."
+    logger: logging.Logger = field(init=False)
+
+    def __post_init__(self) -> None:
+        """Acquires logger for the Store and opens the database."""
+        self.logger = logging.getLogger(__name__)
+        self.connection = sqlite3.connect(self.path, check_same_thread=False)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(
+            SCHEMA + HISTOGRAMS_TABLE + CHECKPOINTS_TABLE + CHECKPOINT_COUNTS_TABLE,
+        )
+        self._migrate()
+        self.logger.info("Opened store at %s.", self.path)
+
+    def _migrate(self) -> None:
+        # The flat activity totals carry no times to convert into hourly
+        # histograms, so they are dropped and live counting starts over.
+        with self.connection:
+            if self.connection.execute(
+                "SELECT 1 FROM sqlite_master"
+                " WHERE type = 'table' AND name = 'activity'",
+            ).fetchone():
+                self.connection.execute("DROP TABLE activity")
+                self.connection.execute(
+                    "DELETE FROM settings WHERE key = 'activity_since'",
+                )
+                self.logger.info("Dropped activity totals for histograms.")
+
+        keys = self.connection.execute("PRAGMA table_info(histograms)").fetchall()
+        if any(row["name"] == "name" and row["pk"] for row in keys):
+            self._rekey_histograms()
+
+        keys = self.connection.execute("PRAGMA table_info(checkpoints)").fetchall()
+        if any(row["name"] == "start" and row["pk"] for row in keys):
+            self._rekey_checkpoints()
+
+    def _rekey_checkpoints(self) -> None:
+        # Checkpoints were once kept per window start, and counts of windows
+        # with different starts cannot be merged, so they are dropped and
+        # the next scan of each channel starts over.
+        with self.connection:
+            self.connection.execute("BEGIN")
+            self.connection.execute("DROP TABLE checkpoints")
+            self.connection.execute("DROP TABLE checkpoint_counts")
+            self.connection.execute(CHECKPOINTS_TABLE)
+            self.connection.execute(CHECKPOINT_COUNTS_TABLE)
+            self.logger.info("Dropped checkpoints for per-channel checkpoints.")
+
+    def _rekey_histograms(self) -> None:
+        # Series were once keyed by display name too, so a renamed author
+        # has several; their hourly counts are merged under the username.
+        with self.connection:
+            self.connection.execute("BEGIN")
+            self.connection.execute("ALTER TABLE histograms RENAME TO histograms_old")
+            self.connection.execute(HISTOGRAMS_TABLE)
+            merged: dict[tuple[int, str], tuple[str, Counter[int]]] = {}
+            for channel_id, name, username, hours, counts in self.connection.execute(
+                "SELECT channel_id, name, username, hours, counts FROM histograms_old",
+            ):
+                _, totals = merged.setdefault((channel_id, username), (name, Counter()))
+                totals.update(
+                    dict(zip(array("I", hours), array("I", counts), strict=True))
+                )
+
+            rows = []
+            for (channel_id, username), (name, totals) in merged.items():
+                hours = sorted(totals)
+                rows.append(
+                    (
+                        channel_id,
+                        name,
+                        username,
+                        array("I", hours).tobytes(),
+                        array("I", (totals[hour] for hour in hours)).tobytes(),
+                    ),
+                )
+            self.connection.executemany(
+                "INSERT INTO histograms VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+            self.connection.execute("DROP TABLE histograms_old")
+            self.logger.info("Merged activity histograms into %d series.", len(rows))
+
+    def _query(self, sql: str, *params: object) -> list[sqlite3.Row]:
+        with self.lock:
+            return self.connection.execute(sql, params).fetchall()
+
+    def write_assignments(
+        self,
+        group: str,
+        rows: Iterable[Mapping[str, object]],
+        emails: Iterable[str] | None = None,
+    ) -> int:
+        """Upserts the assignment report rows of the group in one transaction.
+
+        Args:
+            group (str): The assignment group.
+            rows (Iterable[Mapping]): The report rows, keyed by ASSIGNMENT_COLUMNS.
+            emails (Iterable[str] | None): The emails of everyone still in the
+                group, whose absent rows are removed; None keeps every row.
+
+        Returns:
+            int: The number of rows upserted.
+        """
+        params = [{**row, "grp": group, "found": int(row["found"])} for row in rows]
+        with self.lock, self.connection:
+            self.connection.executemany(
+                """
+                INSERT INTO assignments VALUES (
+                    :grp, :email, :full_name, :display_name,
+                    :username, :role_names, :found, :aliases
+                )
+                ON CONFLICT (grp, email) DO UPDATE SET
+                    full_name = excluded.full_name,
+                    display_name = excluded.display_name,
+                    username = excluded.username,
+                    role_names = excluded.role_names,
+                    found = excluded.found,
+                    aliases = excluded.aliases
+                """,
+                params,
+            )
+            if emails is not None:
+                self.connection.execute(
+                    """
+                    DELETE FROM assignments WHERE grp = ?
+                    AND email NOT IN (SELECT value FROM json_each(?))
+                    """,
+                    (group, json.dumps(list(emails))),
+                )
+
+        self.logger.info("Upserted %d '%s' assignments.", len(params), group)
+        return len(params)
+
+    def get_assignments(self, group: str) -> list[sqlite3.Row]:
+        """Returns the assignment report rows of the group.
+
+        Args:
+            group (str): The assignment group.
+
+        Returns:
+            list[sqlite3.Row]: The report rows, in ASSIGNMENT_COLUMNS order.
+        """
+        return self._query(
+            "SELECT full_name, display_name, username, role_names, email, found,"
+            " aliases FROM assignments WHERE grp = ? ORDER BY rowid",
+            group,
+        )
+
+    def get_unmatched(self, group: str) -> list[sqlite3.Row]:
+        """Returns the people of the group not found on the server.
+
+        Args:
+            group (str): The assignment group.
+
+        Returns:
+            list[sqlite3.Row]: The full names, aliases and role names of the
+                unmatched people.
+        """
+        return self._query(
+            "SELECT full_name, aliases, role_names FROM assignments"
+            " WHERE grp = ? AND found = 0 ORDER BY rowid",
+            group,
+        )
+
+    def write_message_counts(
+        self,
+        report: str,
+        message_counts: Mapping[tuple[str, str], int],
+    ) -> int:
+        """Replaces the message counts of the report in one transaction.
+
+        Counts of a username under several display names are summed, under
+        the display name with the most messages.
+
+        Args:
+            report (str): The name of the message report.
+            message_counts (Mapping): Mapping of (name, username) to counts.
+
+        Returns:
+            int: The number of rows written.
+        """
+        totals: Counter[str] = Counter()
+        names: dict[str, tuple[int, str]] = {}
+        for (name, username), count in message_counts.items():
+            totals[username] += count
+            names[username] = max(names.get(username, (0, name)), (count, name))
+        params = [
+            (report, username, names[username][1], count)
+            for username, count in totals.items()
+        ]
+        with self.lock, self.connection:
+            self.connection.execute("DELETE FROM messages WHERE report = ?", (report,))
+            self.connection.executemany(
+                "INSERT INTO messages VALUES (?, ?, ?, ?)",
+                params,
+            )
+
+        self.logger.info("Wrote %d '%s' message counts.", len(params), report)
+        return len(params)
+
+    def get_message_counts(
+        self,
+        report: str,
+        limit: int = -1,
+    ) -> list[sqlite3.Row]:
+        """Returns the message counts of the report, most active first.
+
+        Args:
+            report (str): The name of the message report.
+            limit (int): The maximum number of rows, or -1 for all of them.
+
+        Returns:
+            list[sqlite3.Row]: The rows, in MESSAGE_COLUMNS order.
+        """
+        return self._query(
+            "SELECT name, username, count FROM messages"
+            " WHERE report = ? ORDER BY count DESC LIMIT ?",
+            report,
+            limit,
+        )
+
+    def get_checkpoint(self, channel_id: int) -> Checkpoint | None:
+        """Returns the checkpoint of a channel's scans, if any.
+
+        Args:
+            channel_id (int): The id of the channel.
+
+        Returns:
+            Checkpoint | None: The checkpoint or None.
+        """
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT start, position, through FROM checkpoints WHERE channel_id = ?",
+                (channel_id,),
+            ).fetchone()
+            if not row:
+                return None
+            counts = self.connection.execute(
+                "SELECT name, username, count FROM checkpoint_counts"
+                " WHERE channel_id = ?",
+                (channel_id,),
+            ).fetchall()
+
+        return Checkpoint(
+            dt.datetime.fromisoformat(row["start"]),
+            row["position"],
+            dt.datetime.fromisoformat(row["through"]),
+            Counter({(name, username): count for name, username, count in counts}),
+        )
+
+    def save_checkpoint(self, channel_id: int, checkpoint: Checkpoint) -> None:
+        """Replaces the checkpoint of a channel's scans in one transaction.
+
+        Args:
+            channel_id (int): The id of the channel.
+            checkpoint (Checkpoint): The checkpoint.
+        """
+        with self.lock, self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?, ?)",
+                (
+                    channel_id,
+                    checkpoint.start.isoformat(),
+                    checkpoint.position,
+                    checkpoint.through.isoformat(),
+                ),
+            )
+            self.connection.execute(
+                "DELETE FROM checkpoint_counts WHERE channel_id = ?",
+                (channel_id,),
+            )
+            self.connection.executemany(
+                "INSERT INTO checkpoint_counts VALUES (?, ?, ?, ?)",
+                [
+                    (channel_id, *author, count)
+                    for author, count in checkpoint.counts.items()
+                ],
+            )
+
+    def get_activity_since(self, now: dt.datetime) -> dt.datetime:
+        """Returns when live activity counting began, starting it now if it hasn't.
+
+        Args:
+            now (dt.datetime): The current time.
+
+        Returns:
+            dt.datetime: The start of live activity counting.
+        """
+        with self.lock, self.connection:
+            self.connection.execute(
+                "INSERT OR IGNORE INTO settings VALUES ('activity_since', ?)",
+                (now.isoformat(),),
+            )
+            row = self.connection.execute(
+                "SELECT value FROM settings WHERE key = 'activity_since'",
+            ).fetchone()
+        return dt.datetime.fromisoformat(row["value"])
+
+    def save_histograms(
+        self, rows: Iterable[tuple[int, str, str, bytes, bytes]]
+    ) -> int:
+        """Saves activity histogram series in one transaction.
+
+        Args:
+            rows (Iterable[tuple]): The channel id, display name, username,
+                hour array and count array of each series.
+
+        Returns:
+            int: The number of series saved.
+        """
+        rows = list(rows)
+        with self.lock, self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO histograms VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+        return len(rows)
+
+    def get_histograms(self) -> list[sqlite3.Row]:
+        """Returns every saved activity histogram series.
+
+        Returns:
+            list[sqlite3.Row]: The channel id, display name, username, hour
+                array and count array of each series.
+        """
+        return self._query(
+            "SELECT channel_id, name, username, hours, counts FROM histograms",
+        )
+
+
+@functools.cache
+def get_store() -> Store:
+    """Returns the bot's shared store.
+
+    Returns:
+        Store: The shared store.
+    """
+    return Store()
+
+
+def export_csv(
+    rows: Iterable[sqlite3.Row],
+    columns: tuple[str, ...],
+    path: str,
+) -> None:
+    """Writes query rows to a csv file.
+
+    The rows are written to a temporary file that then replaces the csv
+    file, so readers never see a partially written file.
+
+    Args:
+        rows (Iterable[sqlite3.Row]): The rows to export.
+        columns (tuple[str, ...]): The column names of the rows.
+        path (str): The path of the csv file.
+    """
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "w", newline="") as csv_file:
+        writer = csv.writer(csv_file)
+        writer.writerow(columns)
+        writer.writerows(rows)
+        csv_file.flush()
+        os.fsync(csv_file.fileno())
+    os.replace(temp_path, path)
+
+
+if __name__ == "__main__":
+    pass